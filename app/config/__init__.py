@@ -1 +1,2 @@
 from .logging import *
+from .settings import *
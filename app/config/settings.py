@@ -0,0 +1,139 @@
+from .logging import logger
+from dotenv import load_dotenv
+from typing import Dict, Tuple
+import json
+import os
+
+load_dotenv()
+
+
+def _json_overrides(name: str, fields: Tuple[str, ...]) -> Dict[str, Dict[str, float]]:
+  """
+  Read the JSON object of numeric overrides in environment variable `name`.
+
+  Invalid JSON, unknown fields and non-numeric values are logged and ignored,
+  so a typo does not keep the app from starting.
+  """
+  try:
+    value = json.loads(os.getenv(name) or "{}")
+  except json.JSONDecodeError as e:
+    logger.error(f"Ignoring {name}: invalid JSON ({e}).")
+    return {}
+  if not isinstance(value, dict):
+    logger.error(f"Ignoring {name}: expected a JSON object.")
+    return {}
+  overrides = {}
+  for key, entry in value.items():
+    if not isinstance(entry, dict):
+      logger.error(f"Ignoring {name}[{key!r}]: expected a JSON object.")
+      continue
+    overrides[key] = {}
+    for field, number in entry.items():
+      if field not in fields or isinstance(number, bool) or not isinstance(
+          number, (int, float)):
+        logger.error(f"Ignoring {name}[{key!r}][{field!r}]: "
+                     f"expected one of {fields} with a number.")
+        continue
+      overrides[key][field] = number
+  return overrides
+
+
+# Storage backend used by helpers.crud: "local" (browser localStorage) or "sqlite".
+STORAGE_BACKEND = os.getenv("LLM4TIME_STORAGE_BACKEND", "local").lower()
+
+# SQLite database path, relative to the project root.
+DATABASE_PATH = os.getenv("LLM4TIME_DATABASE_PATH", "storage/database.db")
+
+# Seconds during which a browser localStorage write is re-delivered on reruns
+# before it is considered acknowledged.
+STORAGE_ACK_TIMEOUT = float(os.getenv("LLM4TIME_STORAGE_ACK_TIMEOUT", "5"))
+
+# Maximum number of records per localStorage segment. Inserts only rewrite the
+# tail segment, so smaller values mean cheaper writes and more keys.
+STORAGE_SEGMENT_SIZE = int(os.getenv("LLM4TIME_STORAGE_SEGMENT_SIZE", "8"))
+
+# Size, in base64 characters, of each localStorage chunk holding an uploaded file.
+STORAGE_CHUNK_SIZE = int(os.getenv("LLM4TIME_STORAGE_CHUNK_SIZE", str(512 * 1024)))
+
+# Backend for uploaded datasets: "local", "sqlite" or "disk" (server-side,
+# content-addressed Arrow files). Defaults to the storage backend.
+FILES_BACKEND = os.getenv("LLM4TIME_FILES_BACKEND", STORAGE_BACKEND).lower()
+
+# Directory of the "disk" files backend, relative to the project root.
+FILES_PATH = os.getenv("LLM4TIME_FILES_PATH", "storage/files")
+
+# Backend for forecast history: "local", "sqlite" or "arrow" (server-side
+# columnar Parquet table). Defaults to the storage backend.
+HISTORY_BACKEND = os.getenv("LLM4TIME_HISTORY_BACKEND", STORAGE_BACKEND).lower()
+
+# Directory of the "arrow" history backend, relative to the project root.
+HISTORY_PATH = os.getenv("LLM4TIME_HISTORY_PATH", "storage/history")
+
+# Seconds to wait once after a flush of cookie writes, so the browser can apply
+# them before a rerun unmounts the cookie component.
+COOKIES_WRITE_DELAY = float(os.getenv("LLM4TIME_COOKIES_WRITE_DELAY", "1"))
+
+# Number of forecasts per page on the history page.
+HISTORY_PAGE_SIZE = int(os.getenv("LLM4TIME_HISTORY_PAGE_SIZE", "20"))
+
+# Memory budget, in megabytes, of the process-wide cache of parsed datasets
+# shared by all sessions (see helpers.datasets).
+DATASET_CACHE_MB = float(os.getenv("LLM4TIME_DATASET_CACHE_MB", "256"))
+
+# Seconds after which an unused pooled model client is closed (see helpers.clients).
+CLIENT_IDLE_TIMEOUT = float(os.getenv("LLM4TIME_CLIENT_IDLE_TIMEOUT", "300"))
+
+# Default number of parallel model calls made by API.response_many().
+API_MAX_CONCURRENCY = int(os.getenv("LLM4TIME_API_MAX_CONCURRENCY", "4"))
+
+# Persistent cache of model responses (see helpers.response_cache): whether the
+# forecast page uses it by default (off, since a cached response replays a
+# single sample at any temperature), its SQLite path relative to the project
+# root, its size budget in megabytes and the lifetime of an entry in seconds
+# (0 keeps entries until evicted).
+RESPONSE_CACHE = os.getenv(
+    "LLM4TIME_RESPONSE_CACHE", "false").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_PATH = os.getenv("LLM4TIME_RESPONSE_CACHE_PATH", "storage/responses.db")
+RESPONSE_CACHE_MB = float(os.getenv("LLM4TIME_RESPONSE_CACHE_MB", "64"))
+RESPONSE_CACHE_TTL = float(os.getenv("LLM4TIME_RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Resilience of model calls (see helpers.resilience): timeout of a call in
+# seconds (0 disables it; a timed-out call is not retried, as its request may
+# still be running), retries after rate-limit, server or connection errors,
+# base and cap of the jittered exponential backoff in seconds (a longer
+# Retry-After fails the call instead), consecutive failures that open a
+# provider's circuit and seconds it stays open before a trial call.
+API_TIMEOUT = float(os.getenv("LLM4TIME_API_TIMEOUT", "300"))
+API_RETRIES = int(os.getenv("LLM4TIME_API_RETRIES", "3"))
+API_BACKOFF = float(os.getenv("LLM4TIME_API_BACKOFF", "1"))
+API_BACKOFF_MAX = float(os.getenv("LLM4TIME_API_BACKOFF_MAX", "30"))
+API_CIRCUIT_THRESHOLD = int(os.getenv("LLM4TIME_API_CIRCUIT_THRESHOLD", "5"))
+API_CIRCUIT_COOLDOWN = float(os.getenv("LLM4TIME_API_CIRCUIT_COOLDOWN", "60"))
+
+# Per-provider overrides of the settings above, as JSON keyed by provider, e.g.
+# {"lmstudio": {"timeout": 900, "retries": 0}}.
+API_PROVIDER_POLICIES = _json_overrides("LLM4TIME_API_PROVIDER_POLICIES", (
+    "timeout", "retries", "backoff", "backoff_max", "failure_threshold", "cooldown"))
+
+# Rate limits of model calls (see helpers.rate_limit), shared by all sessions:
+# requests and tokens per minute of each provider/model, 0 meaning unlimited.
+# LLM4TIME_API_RATE_LIMITS overrides them as JSON keyed by "<provider>/<model>"
+# or "<provider>", e.g. {"azure": {"rpm": 60, "tpm": 90000}}.
+API_RPM = float(os.getenv("LLM4TIME_API_RPM", "0"))
+API_TPM = float(os.getenv("LLM4TIME_API_TPM", "0"))
+API_RATE_LIMITS = _json_overrides("LLM4TIME_API_RATE_LIMITS", ("rpm", "tpm"))
+
+# Estimate of the tokens of a call before it is made: output tokens expected
+# when the call sets no max_tokens, and prompt characters per token.
+API_EXPECTED_OUTPUT_TOKENS = int(
+    os.getenv("LLM4TIME_API_EXPECTED_OUTPUT_TOKENS", "1024"))
+API_CHARS_PER_TOKEN = float(os.getenv("LLM4TIME_API_CHARS_PER_TOKEN", "4"))
+
+# OpenAI-compatible endpoint of the local LM Studio server, used to stream its
+# responses (see helpers.streaming).
+LMSTUDIO_BASE_URL = os.getenv("LLM4TIME_LMSTUDIO_BASE_URL", "http://localhost:1234/v1")
+
+# Interface the mock provider's OpenAI-compatible HTTP stand-in listens on, and
+# its default port (see helpers.mock).
+MOCK_SERVER_HOST = os.getenv("LLM4TIME_MOCK_SERVER_HOST", "127.0.0.1")
+MOCK_SERVER_PORT = int(os.getenv("LLM4TIME_MOCK_SERVER_PORT", "8765"))
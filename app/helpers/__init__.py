@@ -1,2 +1,10 @@
 from .api import *
+from .clients import *
+from .credentials import *
 from .crud import *
+from .datasets import *
+from .mock import *
+from .rate_limit import *
+from .resilience import *
+from .response_cache import *
+from .streaming import *
@@ -1,113 +1,332 @@
 import llm4time as l4t
 from helpers import crud
-from utils import normalize
-from storage.cookies import get_cookie
-from config import logger
-import numpy as np
-import random
+from helpers.clients import client_pool, credential_fingerprint
+from helpers.response_cache import response_cache, response_key
+from helpers.resilience import (RetryPolicy, RequestTimeoutError, circuit_breakers,
+                                call_with_retries, call_with_timeout)
+from helpers.rate_limit import estimate_tokens, rate_limiters
+from helpers.mock import MOCK_PROVIDER, MockClient
+from helpers.streaming import StreamingClient
+from helpers.credentials import model_credentials
+from config import API_MAX_CONCURRENCY, LMSTUDIO_BASE_URL, RESPONSE_CACHE, logger
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+import hashlib
+import json
+import time
+
+
+class APIResponse:
+  """A ModelResponse returned by API, with the metadata API attached to it (timing, ...)."""
+
+  __slots__ = ("response", "metadata")
+
+  def __init__(self, response: l4t.ModelResponse, metadata: Dict[str, Any] | None = None):
+    self.response = response
+    self.metadata = metadata or {}
+
+  def __getattr__(self, name: str) -> Any:
+    # Only called for names missing on the wrapper; `response` itself can be
+    # unset while the object is being unpickled or copied.
+    try:
+      response = object.__getattribute__(self, "response")
+    except AttributeError:
+      raise AttributeError(name) from None
+    return getattr(response, name)
+
+
+def response_metadata(response: l4t.ModelResponse | APIResponse) -> Dict[str, Any]:
+  """Metadata attached to a response by API; empty if there is none."""
+  return response.metadata if isinstance(response, APIResponse) else {}
+
+
+def _annotate(response: l4t.ModelResponse | APIResponse, **metadata) -> APIResponse:
+  if isinstance(response, APIResponse):
+    response.metadata.update(metadata)
+    return response
+  return APIResponse(response, metadata)
+
+
+def _error_response(message: str) -> APIResponse:
+  return APIResponse(l4t.ModelResponse(
+      raw=message,
+      predicted=None,
+      input_tokens=None,
+      output_tokens=None,
+      time=None
+  ))
 
 
 class API:
-  def __init__(self, model: str, provider: l4t.Provider):
+  def __init__(self, model: str, provider: l4t.Provider | str,
+               reference: Tuple[l4t.TimeSeries, l4t.TSFormat, l4t.TSType] | None = None):
+    """
+    `reference` is the (series, tsformat, tstype) the mock provider answers with,
+    plus noise, so its responses parse like a forecast; other providers ignore it.
+    """
     self.model = model
     self.provider = provider
+    self.reference = reference
 
-  def response(self, content: str, temperature: float, **kwargs) -> l4t.ModelResponse:
+  def _client(self) -> Tuple[Callable[[str], Any], tuple] | None:
+    """Client factory and pool key of the configured provider, or None if it is unknown."""
     if str(self.provider) == str(l4t.Provider.LM_STUDIO):
-      return self._lmstudio(content, temperature, **kwargs)
+      return self._lmstudio()
     elif str(self.provider) == str(l4t.Provider.OPENAI):
-      return self._openai(content, temperature, **kwargs)
+      return self._openai()
     elif str(self.provider) == str(l4t.Provider.AZURE):
-      return self._azure_openai(content, temperature, **kwargs)
-    else:
-      logger.error(f"Unknown provider: {self.provider}")
-      return l4t.ModelResponse(
-          raw=f"Unknown provider: {self.provider}",
-          predicted=None,
-          input_tokens=None,
-          output_tokens=None,
-          time=None
-      )
-
-  def _lmstudio(self, content: str, temperature: float, **kwargs):
-    return self._call_client(lambda model: l4t.LMStudio(model),
-                             content, temperature, **kwargs)
-
-  def _openai(self, content: str, temperature: float, **kwargs):
-    prefix = normalize(f"{self.provider}_{self.model}")
-    api_key = get_cookie(f"{prefix}:api_key")
-    base_url = get_cookie(f"{prefix}:base_url")
+      return self._azure_openai()
+    elif str(self.provider) == MOCK_PROVIDER:
+      return self._mock()
+    logger.error(f"Unknown provider: {self.provider}")
+    return None
+
+  def response(self, content: str, temperature: float, cache: bool = RESPONSE_CACHE,
+               **kwargs) -> APIResponse:
+    """
+    Predict `content` with the model.
+
+    With `cache`, identical requests (provider, model, endpoint, temperature,
+    kwargs and prompt) are answered from the response cache, and
+    response_metadata() reports `cached`.
+    """
+    client = self._client()
+    if client is None:
+      return _error_response(f"Unknown provider: {self.provider}")
+    return self._predict(client, content, temperature, cache, **kwargs)
+
+  def stream(self, content: str, temperature: float, on_token: Callable[[str], None],
+             cache: bool = RESPONSE_CACHE, **kwargs) -> APIResponse:
+    """
+    Like response(), calling `on_token` with each chunk of text as the model produces it.
+
+    response_metadata() reports `ttft`, the seconds until the first chunk. The
+    OpenAI, Azure and LM Studio providers stream through their OpenAI-compatible
+    API (see StreamingClient). Clients without a `stream` method are called
+    through predict() and their whole response is passed as a single chunk; so
+    are cached responses. Both have no first token to time, and report a `ttft`
+    of None.
+    """
+    client = self._client()
+    if client is None:
+      return _error_response(f"Unknown provider: {self.provider}")
+    return self._predict(client, content, temperature, cache, on_token=on_token, **kwargs)
+
+  def response_many(self, prompts: List[str], temperature: float,
+                    max_concurrency: int | None = None, cache: bool = RESPONSE_CACHE,
+                    **kwargs) -> List[APIResponse]:
+    """
+    Run several prompts against the model in parallel, at most `max_concurrency` at a time.
+
+    Responses are returned in the order of `prompts`; failed calls are returned
+    as error responses like in response(). Each response carries its `index`,
+    `queue_time` (seconds waiting for a worker) and `wall_time` (seconds of the
+    call) in response_metadata().
+    """
+    client = self._client()
+    if client is None:
+      return [_error_response(f"Unknown provider: {self.provider}") for _ in prompts]
+    if not prompts:
+      return []
+
+    # Credentials are resolved above, in the script thread; workers only use the client.
+    max_workers = max(1, min(max_concurrency or API_MAX_CONCURRENCY, len(prompts)))
+    submitted_at = time.perf_counter()
+
+    def run(index: int, prompt: str) -> APIResponse:
+      started_at = time.perf_counter()
+      response = self._predict(client, prompt, temperature, cache, **kwargs)
+      return _annotate(response, index=index,
+                       queue_time=started_at - submitted_at,
+                       wall_time=time.perf_counter() - started_at)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm4time-api") as executor:
+      futures = [executor.submit(run, i, prompt) for i, prompt in enumerate(prompts)]
+      return [future.result() for future in futures]
+
+  def _lmstudio(self) -> Tuple[Callable[[str], Any], tuple]:
+    def sdk():
+      import openai
+      # The local server accepts any key.
+      return openai.OpenAI(base_url=LMSTUDIO_BASE_URL, api_key="lm-studio")
+
+    return (
+        lambda model: StreamingClient(
+            l4t.LMStudio(model), sdk, model, include_usage=False),
+        self._pool_key()
+    )
+
+  def _openai(self) -> Tuple[Callable[[str], Any], tuple]:
+    settings = model_credentials(self.provider, self.model)
+    api_key = settings.get("api_key")
+    base_url = settings.get("base_url")
     logger.info(f"BASE_URL: {base_url}")
-    return self._call_client(
-        lambda model: l4t.OpenAI(api_key=api_key, base_url=base_url, model=model),
-        content, temperature, **kwargs
+
+    def sdk():
+      import openai
+      return openai.OpenAI(api_key=api_key, base_url=base_url)
+
+    return (
+        lambda model: StreamingClient(
+            l4t.OpenAI(api_key=api_key, base_url=base_url, model=model), sdk, model),
+        self._pool_key(base_url, api_key=api_key)
     )
 
-  def _azure_openai(self, content: str, temperature: float, **kwargs):
-    prefix = normalize(f"{self.provider}_{self.model}")
-    api_key = get_cookie(f"{prefix}:api_key")
-    endpoint = get_cookie(f"{prefix}:endpoint")
-    api_version = get_cookie(f"{prefix}:api_version")
+  def _azure_openai(self) -> Tuple[Callable[[str], Any], tuple]:
+    settings = model_credentials(self.provider, self.model)
+    api_key = settings.get("api_key")
+    endpoint = settings.get("endpoint")
+    api_version = settings.get("api_version")
     logger.info(f"ENDPOINT: {endpoint}")
     logger.info(f"API_VERSION: {api_version}")
-    return self._call_client(
-        lambda model: l4t.AzureOpenAI(
-            api_key=api_key,
-            azure_endpoint=endpoint,
-            api_version=api_version,
-            model=model
+
+    def sdk():
+      import openai
+      return openai.AzureOpenAI(
+          api_key=api_key, azure_endpoint=endpoint, api_version=api_version)
+
+    return (
+        lambda model: StreamingClient(
+            l4t.AzureOpenAI(
+                api_key=api_key,
+                azure_endpoint=endpoint,
+                api_version=api_version,
+                model=model
+            ),
+            sdk,
+            model
         ),
-        content, temperature, **kwargs
+        self._pool_key(endpoint, api_version, api_key)
     )
 
-  def _get_model_data(self) -> dict:
-    models_crud = crud.crud_models()
-    all_models = models_crud._load()
+  def _mock(self) -> Tuple[Callable[[str], Any], tuple]:
+    config = model_credentials(self.provider, self.model).get("config") or {}
+    if isinstance(config, str):
+      config = json.loads(config)
+    # Clients are pooled per configuration and reference series, so a seeded
+    # mock replays the same sequence for the same data.
+    reference = None
+    if self.reference is not None:
+      ts, tsformat, tstype = self.reference
+      reference = hashlib.sha256(
+          f"{ts.to_str(format='csv')}|{tsformat}|{tstype}".encode("utf-8")).hexdigest()
+    return (
+        lambda model: MockClient(model, config, self.reference),
+        self._pool_key(json.dumps(config, sort_keys=True), api_key=reference)
+    )
 
-    for m in all_models:
-      if m["name"] == self.model and m["provider"] == self.provider:
-        return m
+  def _get_model_data(self) -> dict:
+    model = crud.crud_models().get(self.model, str(self.provider))
+    if model:
+      return model
 
     logger.warning(f"Model data not found for {self.model} ({self.provider})")
     return {}
 
-  def _call_client(self, client_class, content: str, temperature: float, **kwargs) -> l4t.ModelResponse:
+  def _pool_key(self, endpoint: str | None = None, api_version: str | None = None,
+                api_key: str | None = None) -> tuple:
+    return (str(self.provider), self.model, endpoint, api_version, credential_fingerprint(api_key))
+
+  def _predict(self, client: Tuple[Callable[[str], Any], tuple], content: str,
+               temperature: float, cache: bool, on_token: Callable[[str], None] | None = None,
+               **kwargs) -> APIResponse:
+    # The mock is cheap and deterministic; caching it would hide its latency.
+    cache = cache and str(self.provider) != MOCK_PROVIDER
+    key = response_key(client[1], temperature, content, **kwargs) if cache else None
+    if key is not None:
+      try:
+        cached = response_cache().get(key)
+        if cached is not None:
+          logger.info("Response served from cache.")
+          if on_token is not None:
+            on_token(cached.raw)
+            cached = _annotate(cached, ttft=None)
+          return _annotate(cached, cached=True)
+      except Exception as e:
+        logger.error(f"Error reading response cache: {e}")
+
+    response = self._call_client(*client, content, temperature, on_token=on_token, **kwargs)
+    if key is not None:
+      try:
+        response_cache().put(key, response)
+      except Exception as e:
+        logger.error(f"Error writing response cache: {e}")
+    return _annotate(response, cached=False)
+
+  def _call_client(self, client_class, pool_key: tuple, content: str, temperature: float,
+                   on_token: Callable[[str], None] | None = None, **kwargs) -> APIResponse:
+    """
+    Call the pooled client with the provider's timeout, retry and circuit-breaker policy.
+
+    Each attempt first waits for the provider/model rate limiter. response_metadata()
+    reports the `attempts` made and the seconds spent in `backoff` and `rate_wait`.
+    """
+    policy = RetryPolicy.for_provider(self.provider)
+    breaker = circuit_breakers().get((pool_key[0], pool_key[2]), policy)
+    limiter = rate_limiters().get(self.provider, self.model)
+    estimate = estimate_tokens(content, kwargs.get("max_tokens"))
+    stats = {"attempts": 0, "backoff": 0.0, "rate_wait": 0.0}
+    streamed = False
+
+    def emit(chunk: str) -> None:
+      nonlocal streamed
+      streamed = True
+      on_token(chunk)
+
+    def attempt() -> l4t.ModelResponse | APIResponse:
+      stats["rate_wait"] += limiter.acquire(estimate)
+      client = client_pool().get(pool_key, lambda: client_class(self.model))
+      if on_token is None:
+        return call_with_timeout(
+            lambda: client.predict(content, temperature=temperature, **kwargs), policy.timeout)
+      return self._stream_client(client, content, temperature, emit, policy.timeout, **kwargs)
+
     try:
-      client = client_class(self.model)
-      response = client.predict(content, temperature=temperature, **kwargs)
+      # A stream is not retried once part of it has been shown.
+      response = call_with_retries(attempt, policy, breaker, stats, retryable=lambda: not streamed)
+      if response.input_tokens is not None and response.output_tokens is not None:
+        limiter.settle(estimate, response.input_tokens + response.output_tokens)
       logger.info(f"Response: {response.predicted}")
       logger.info(f"Input Tokens: {response.input_tokens}")
       logger.info(f"Output Tokens: {response.output_tokens}")
       logger.info(f"Time: {response.time:.2f} seconds")
-      return response
+      return _annotate(response, **stats)
     except Exception as e:
       logger.error(f"Error generating response: {e}")
-      return l4t.ModelResponse(
-          raw=str(e),
-          predicted=None,
-          input_tokens=None,
-          output_tokens=None,
-          time=None
-      )
+      return _annotate(_error_response(str(e)), **stats)
 
   @staticmethod
-  def _mock(ts: l4t.TimeSeries, tsformat: l4t.TSFormat, tstype: l4t.TSType) -> l4t.ModelResponse:
-    pred = ts.copy()
-    for column in pred.columns:
-      pred[column] = pred[column] + np.random.normal(0, 0.5, size=len(pred))
-
-    response = pred.to_str(format=tsformat, type=tstype)
-    response_time = round(random.uniform(0.5, 2.5), 2)
-    input_tokens = random.randint(10, 500)
-    output_tokens = random.randint(10, 500)
-    logger.info(f"Input Tokens: {input_tokens}")
-    logger.info(f"Output Tokens: {output_tokens}")
-    logger.info(f"Time: {response_time:.2f} seconds")
-
-    return l4t.ModelResponse(
-        raw=response,
-        predicted=response,
-        input_tokens=input_tokens,
-        output_tokens=output_tokens,
-        time=response_time
-    )
+  def _stream_client(client, content: str, temperature: float, on_token: Callable[[str], None],
+                     timeout: float, **kwargs) -> APIResponse:
+    started_at = time.perf_counter()
+    ttft = None
+
+    def emit(chunk: str) -> None:
+      nonlocal ttft
+      if ttft is None:
+        ttft = time.perf_counter() - started_at
+        logger.info(f"Time to first token: {ttft:.2f} seconds")
+      on_token(chunk)
+
+    if not hasattr(client, "stream"):
+      response = call_with_timeout(
+          lambda: client.predict(content, temperature=temperature, **kwargs), timeout)
+      on_token(response.raw or "")
+      return _annotate(response, ttft=None)
+
+    # The client's stream yields text chunks and returns the parsed ModelResponse.
+    # Chunks are fetched in a worker thread so that `timeout` bounds the whole
+    # stream, while `on_token` keeps running in the calling (script) thread.
+    chunks = client.stream(content, temperature=temperature, **kwargs)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm4time-stream")
+    try:
+      while True:
+        remaining = timeout - (time.perf_counter() - started_at) if timeout else 0
+        if timeout and remaining <= 0:
+          raise RequestTimeoutError(f"Response not completed after {timeout:g} seconds")
+        try:
+          emit(call_with_timeout(lambda: next(chunks), remaining, executor))
+        except StopIteration as stop:
+          return _annotate(stop.value, ttft=ttft)
+    finally:
+      executor.shutdown(wait=False)
@@ -0,0 +1,84 @@
+from config import CLIENT_IDLE_TIMEOUT, logger
+from typing import Any, Callable, Dict, Tuple
+import streamlit as st
+import threading
+import hashlib
+import time
+
+
+def credential_fingerprint(secret: str | None) -> str | None:
+  """Short, non-reversible identifier of a credential, safe to keep in pool keys."""
+  if not secret:
+    return None
+  return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+
+
+class ClientPool:
+  """
+  Process-wide pool of model clients, so their HTTP connections are reused.
+
+  Clients are keyed by (provider, model, endpoint, api_version, credential
+  fingerprint). A client whose credentials changed is replaced, and clients
+  unused for `idle_timeout` seconds are dropped.
+  """
+
+  def __init__(self, idle_timeout: float):
+    self.idle_timeout = idle_timeout
+    self._clients: Dict[Tuple, Dict[str, Any]] = {}
+    self._lock = threading.Lock()
+    self.created = 0
+    self.reused = 0
+    self.evicted = 0
+
+  def _evict_idle(self, now: float) -> None:
+    for key, entry in list(self._clients.items()):
+      if now - entry["last_used"] > self.idle_timeout:
+        del self._clients[key]
+        self.evicted += 1
+
+  def get(self, key: Tuple, factory: Callable[[], Any]) -> Any:
+    now = time.monotonic()
+    with self._lock:
+      self._evict_idle(now)
+      entry = self._clients.get(key)
+      if entry is not None:
+        entry["last_used"] = now
+        self.reused += 1
+        return entry["client"]
+      # Same deployment with other credentials: the old client is stale.
+      for stale in [k for k in self._clients if k[:-1] == key[:-1]]:
+        del self._clients[stale]
+        self.evicted += 1
+        logger.info(f"Credentials changed for {key[0]} / {key[1]}, client replaced.")
+
+    client = factory()
+    with self._lock:
+      self._clients[key] = {"client": client, "last_used": now}
+      self.created += 1
+    return client
+
+  def clear(self) -> None:
+    with self._lock:
+      self.evicted += len(self._clients)
+      self._clients.clear()
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      total = self.created + self.reused
+      return {
+          "clients": len(self._clients),
+          "created": self.created,
+          "reused": self.reused,
+          "evicted": self.evicted,
+          "reuse_rate": self.reused / total if total else 0.0,
+          "idle_timeout": self.idle_timeout,
+      }
+
+
+@st.cache_resource
+def client_pool() -> ClientPool:
+  return ClientPool(CLIENT_IDLE_TIMEOUT)
+
+
+def client_pool_stats() -> Dict[str, Any]:
+  return client_pool().stats()
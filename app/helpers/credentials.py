@@ -0,0 +1,44 @@
+from storage.cookies import all_cookies
+from storage.instrumentation import timed
+from utils import normalize
+from typing import Dict
+import streamlit as st
+
+# Settings of the models resolved in this session, by cookie prefix.
+_CREDENTIALS_KEY = "_model_credentials"
+
+
+def credential_prefix(provider: str, model: str) -> str:
+  """Prefix of the `<prefix>:<field>` cookies holding a model's settings."""
+  return normalize(f"{provider}_{model}")
+
+
+def model_credentials(provider: str, model: str) -> Dict[str, str]:
+  """
+  Cookie settings of a model (api_key, base_url, endpoint, ...) by field.
+
+  All of the model's cookies are read in one pass on first use and then served
+  from session state, until invalidate_credentials() is called for the model.
+  """
+  cache = st.session_state.setdefault(_CREDENTIALS_KEY, {})
+  prefix = credential_prefix(provider, model)
+  if prefix not in cache:
+    with timed("cookies", "credentials", prefix):
+      cache[prefix] = {
+          key[len(prefix) + 1:]: value
+          for key, value in all_cookies().items()
+          if key.startswith(f"{prefix}:") and value
+      }
+  return cache[prefix]
+
+
+def invalidate_credentials(provider: str | None = None,
+                           model: str | None = None) -> None:
+  """Forget the resolved settings of a model, or of all models without arguments."""
+  cache = st.session_state.get(_CREDENTIALS_KEY)
+  if cache is None:
+    return
+  if provider is None or model is None:
+    cache.clear()
+  else:
+    cache.pop(credential_prefix(provider, model), None)
@@ -1,22 +1,40 @@
+from config import STORAGE_BACKEND, DATABASE_PATH, FILES_BACKEND, FILES_PATH
+from config import HISTORY_BACKEND, HISTORY_PATH
+from contextlib import nullcontext
+from utils import abspath
 import storage
-# from utils import abspath
 
 
 def crud_history():
+  if HISTORY_BACKEND == "arrow":
+    return storage.ArrowHistoryStorage(abspath(HISTORY_PATH))
+  if HISTORY_BACKEND == "sqlite":
+    return storage.SQLiteHistoryStorage(abspath(DATABASE_PATH))
   return storage.LocalHistoryStorage()
-  # return storage.SQLiteHistoryStorage(abspath("storage/database.db"))
 
 
 def crud_models():
+  if STORAGE_BACKEND == "sqlite":
+    return storage.SQLiteModelsStorage(abspath(DATABASE_PATH))
   return storage.LocalModelsStorage()
-  # return storage.SQLiteModelsStorage(abspath("storage/database.db"))
 
 
 def crud_prompts():
+  if STORAGE_BACKEND == "sqlite":
+    return storage.SQLitePromptsStorage(abspath(DATABASE_PATH))
   return storage.LocalPromptsStorage()
-  # return storage.SQLitePromptsStorage(abspath("storage/database.db"))
 
 
 def crud_files():
+  if FILES_BACKEND == "disk":
+    return storage.DiskFilesStorage(abspath(FILES_PATH))
+  if FILES_BACKEND == "sqlite":
+    return storage.SQLiteFilesStorage(abspath(DATABASE_PATH))
   return storage.LocalFilesStorage()
-  # return storage.SQLiteFilesStorage(abspath("storage/database.db"))
+
+
+def batch():
+  """Group browser localStorage writes made inside the block; no-op for other backends."""
+  if "local" in (STORAGE_BACKEND, HISTORY_BACKEND, FILES_BACKEND):
+    return storage.LocalStorage().batch()
+  return nullcontext()
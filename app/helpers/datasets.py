@@ -0,0 +1,99 @@
+import llm4time as l4t
+from helpers import crud
+from config import DATASET_CACHE_MB, logger
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+import streamlit as st
+import pandas as pd
+import threading
+import hashlib
+import io
+
+
+class DatasetCache:
+  """
+  LRU of parsed datasets keyed by the SHA-256 of their content.
+
+  Entries are evicted, least recently used first, once their total in-memory
+  size exceeds `max_bytes`. Cached series are shared between sessions and must
+  not be modified in place.
+  """
+
+  def __init__(self, max_bytes: int):
+    self.max_bytes = max_bytes
+    self._entries: OrderedDict[str, tuple] = OrderedDict()
+    self._lock = threading.Lock()
+    self._bytes = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get(self, digest: str,
+          loader: Callable[[], l4t.MultiTimeSeries]) -> l4t.MultiTimeSeries:
+    with self._lock:
+      if digest in self._entries:
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return self._entries[digest][0]
+      self.misses += 1
+
+    ts = loader()
+    size = int(ts.memory_usage(deep=True).sum())
+    with self._lock:
+      if digest not in self._entries:
+        self._entries[digest] = (ts, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+          _, (_, evicted) = self._entries.popitem(last=False)
+          self._bytes -= evicted
+          self.evictions += 1
+    return ts
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      total = self.hits + self.misses
+      return {
+          "entries": len(self._entries),
+          "bytes": self._bytes,
+          "max_bytes": self.max_bytes,
+          "hits": self.hits,
+          "misses": self.misses,
+          "evictions": self.evictions,
+          "hit_rate": self.hits / total if total else 0.0,
+      }
+
+
+@st.cache_resource
+def _dataset_cache() -> DatasetCache:
+  return DatasetCache(int(DATASET_CACHE_MB * 1024 * 1024))
+
+
+def _parse(frame: pd.DataFrame) -> l4t.MultiTimeSeries:
+  return l4t.MultiTimeSeries(l4t.read_file(frame, index_col="datetime"))
+
+
+def load_dataset(filename: str) -> l4t.MultiTimeSeries | None:
+  """Return the parsed series of an uploaded file, shared across sessions and reruns."""
+  files = crud.crud_files()
+  record = next((f for f in files.select_all() if f.get("filename") == filename), None)
+  if record is None:
+    return None
+
+  digest = record.get("hash")
+  if digest is None:
+    # Uploaded before content hashes were stored with the file: hash it once.
+    content = files.read(filename)
+    digest = hashlib.sha256(content).hexdigest()
+    files.update_metadata(filename, {"hash": digest, "size": len(content)})
+    return _dataset_cache().get(
+        digest, lambda: _parse(pd.read_csv(io.BytesIO(content))))
+
+  def loader() -> l4t.MultiTimeSeries:
+    logger.info(f"Parsing dataset '{filename}' ({digest[:12]}).")
+    return _parse(files.read_frame(filename))
+
+  return _dataset_cache().get(digest, loader)
+
+
+def dataset_cache_stats() -> Dict[str, Any]:
+  return _dataset_cache().stats()
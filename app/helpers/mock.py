@@ -0,0 +1,280 @@
+import llm4time as l4t
+from config import API_CHARS_PER_TOKEN, MOCK_SERVER_HOST, logger
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Tuple
+import streamlit as st
+import numpy as np
+import threading
+import hashlib
+import json
+import math
+import time
+import uuid
+
+# Provider name of the mock models; llm4time has no such provider.
+MOCK_PROVIDER = "mock"
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "lognormal")
+
+MOCK_DEFAULTS = {
+    "latency": "lognormal",     # Distribution of the time to first token.
+    "latency_mean": 1.0,        # Mean time to first token, in seconds.
+    "latency_spread": 0.5,      # Half-width of "uniform" (s) or sigma of "lognormal".
+    "tokens_per_second": 50.0,  # Output rate; 0 returns the whole output at once.
+    "output_tokens": 200,       # Output length when there is no reference series.
+    "error_rate": 0.0,          # Share of calls failing with `error_status`.
+    "error_status": 503,
+    "seed": 42,                 # None draws a new sample on every call.
+    "run": 0,                   # Run id; another run draws new samples, same seed.
+}
+
+
+class MockError(Exception):
+  """Exception raised by the mock provider for an injected error."""
+
+  def __init__(self, status_code: int, message: str):
+    super().__init__(f"Error code: {status_code} - {message}")
+    self.status_code = status_code
+
+
+class MockClient:
+  """
+  Offline stand-in for the llm4time model clients.
+
+  Latency, output rate and injected errors follow `config` (see MOCK_DEFAULTS).
+  Each call draws from a generator seeded with the seed, the run id and the
+  prompt only, so a run is reproducible however calls interleave and whatever
+  the client's lifetime; a prompt drawn to fail also fails its retries. With a
+  `reference` (series, tsformat, tstype) the output is that series with
+  noise added, formatted like a model forecast; otherwise it is random numbers.
+  """
+
+  def __init__(
+      self, model: str, config: Dict[str, Any] | None = None,
+      reference: Tuple[l4t.TimeSeries, l4t.TSFormat, l4t.TSType] | None = None):
+    self.model = model
+    self.config = {**MOCK_DEFAULTS, **(config or {})}
+    self.reference = reference
+
+  def _rng(self, content: str) -> np.random.Generator:
+    seed = self.config["seed"]
+    if seed is None:
+      return np.random.default_rng()
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return np.random.default_rng(
+        [int(seed), int(self.config["run"]), int(digest[:15], 16)])
+
+  def _latency(self, rng: np.random.Generator) -> float:
+    mean, spread = self.config["latency_mean"], self.config["latency_spread"]
+    if self.config["latency"] == "uniform":
+      return max(0.0, rng.uniform(mean - spread, mean + spread))
+    if self.config["latency"] == "lognormal" and mean > 0:
+      # Parameterized so that the distribution's mean is `mean`.
+      return rng.lognormal(math.log(mean) - spread ** 2 / 2, spread)
+    return max(0.0, mean)
+
+  def _output(self, rng: np.random.Generator) -> str:
+    if self.reference is None:
+      values = rng.normal(0, 1, size=max(1, self.config["output_tokens"] // 4))
+      return "\n".join(f"{v:.3f}" for v in values)
+    ts, tsformat, tstype = self.reference
+    pred = ts.copy()
+    for column in pred.columns:
+      pred[column] = pred[column] + rng.normal(0, 0.5, size=len(pred))
+    return pred.to_str(format=tsformat, type=tstype)
+
+  def _plan(self, content: str) -> Dict[str, Any]:
+    rng = self._rng(content)
+    text = self._output(rng)
+    return {
+        "latency": self._latency(rng),
+        "error": rng.random() < self.config["error_rate"],
+        "text": text,
+        "input_tokens": math.ceil(len(content) / API_CHARS_PER_TOKEN),
+        "output_tokens": math.ceil(len(text) / API_CHARS_PER_TOKEN),
+    }
+
+  def _fail(self) -> None:
+    status = int(self.config["error_status"])
+    raise MockError(status, "Injected error from the mock provider.")
+
+  def _chunks(self, plan: Dict[str, Any]) -> Iterator[Tuple[str, float]]:
+    """Chunks of the output with the seconds to wait before each, ~20 ms apart."""
+    rate = self.config["tokens_per_second"]
+    text = plan["text"]
+    if not rate:
+      yield text, 0.0
+      return
+    tokens = max(1, round(rate * 0.02))
+    size = max(1, int(tokens * API_CHARS_PER_TOKEN))
+    for start in range(0, len(text), size):
+      chunk = text[start:start + size]
+      yield chunk, len(chunk) / API_CHARS_PER_TOKEN / rate
+
+  def _response(self, plan: Dict[str, Any], started_at: float) -> l4t.ModelResponse:
+    return l4t.ModelResponse(
+        raw=plan["text"],
+        predicted=plan["text"],
+        input_tokens=plan["input_tokens"],
+        output_tokens=plan["output_tokens"],
+        time=time.perf_counter() - started_at
+    )
+
+  def predict(self, content: str, temperature: float = 0.7,
+              **kwargs) -> l4t.ModelResponse:
+    started_at = time.perf_counter()
+    plan = self._plan(content)
+    time.sleep(plan["latency"])
+    if plan["error"]:
+      self._fail()
+    time.sleep(sum(delay for _, delay in self._chunks(plan)))
+    return self._response(plan, started_at)
+
+  def stream(self, content: str, temperature: float = 0.7, **kwargs):
+    started_at = time.perf_counter()
+    plan = self._plan(content)
+    time.sleep(plan["latency"])
+    if plan["error"]:
+      self._fail()
+    for chunk, delay in self._chunks(plan):
+      time.sleep(delay)
+      yield chunk
+    return self._response(plan, started_at)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+  server: "MockServer"
+
+  def log_message(self, format, *args) -> None:
+    logger.debug(f"Mock server: {format % args}")
+
+  def _json(self, status: int, body: Dict[str, Any],
+            headers: Dict[str, str] | None = None) -> None:
+    data = json.dumps(body).encode("utf-8")
+    self.send_response(status)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(data)))
+    for name, value in (headers or {}).items():
+      self.send_header(name, value)
+    self.end_headers()
+    self.wfile.write(data)
+
+  def do_GET(self) -> None:
+    if self.path.rstrip("/") in ("/v1/models", "/models"):
+      self._json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+    else:
+      self._json(404, {"error": {"message": "Not found"}})
+
+  def do_POST(self) -> None:
+    if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+      self._json(404, {"error": {"message": "Not found"}})
+      return
+    length = int(self.headers.get("Content-Length", 0))
+    body = json.loads(self.rfile.read(length) or b"{}")
+    model = body.get("model", "mock")
+    content = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    client = self.server.client
+    started_at = time.perf_counter()
+    plan = client._plan(content)
+    time.sleep(plan["latency"])
+    if plan["error"]:
+      status = int(client.config["error_status"])
+      self._json(status, {"error": {"message": "Injected error from the mock provider.",
+                                    "type": "mock_error", "code": status}},
+                 {"Retry-After": "1"} if status == 429 else None)
+      return
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    usage = {
+        "prompt_tokens": plan["input_tokens"],
+        "completion_tokens": plan["output_tokens"],
+        "total_tokens": plan["input_tokens"] + plan["output_tokens"],
+    }
+    if not body.get("stream"):
+      time.sleep(sum(delay for _, delay in client._chunks(plan)))
+      self._json(200, {
+          "id": completion_id,
+          "object": "chat.completion",
+          "created": int(time.time()),
+          "model": model,
+          "choices": [{"index": 0, "finish_reason": "stop",
+                       "message": {"role": "assistant", "content": plan["text"]}}],
+          "usage": usage,
+      })
+      return
+
+    self.send_response(200)
+    self.send_header("Content-Type", "text/event-stream")
+    self.send_header("Cache-Control", "no-cache")
+    self.end_headers()
+
+    def event(delta: Dict[str, Any], finish_reason: str | None = None, **extra) -> None:
+      chunk = {"id": completion_id, "object": "chat.completion.chunk",
+               "created": int(time.time()), "model": model,
+               "choices": [{"index": 0, "delta": delta,
+                            "finish_reason": finish_reason}],
+               **extra}
+      self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+      self.wfile.flush()
+
+    event({"role": "assistant", "content": ""})
+    for chunk, delay in client._chunks(plan):
+      time.sleep(delay)
+      event({"content": chunk})
+    event({}, "stop", usage=usage)
+    self.wfile.write(b"data: [DONE]\n\n")
+    elapsed = time.perf_counter() - started_at
+    logger.debug(f"Mock server answered in {elapsed:.2f} seconds.")
+
+
+class MockServer(ThreadingHTTPServer):
+  """
+  Local OpenAI-compatible chat completions endpoint backed by a MockClient.
+
+  Configure an "OpenAI / Ollama" model with the server's `base_url` to
+  benchmark the whole network path of the real clients.
+  """
+
+  daemon_threads = True
+
+  def __init__(self, config: Dict[str, Any], host: str, port: int):
+    super().__init__((host, port), _MockHandler)
+    self.config = {**MOCK_DEFAULTS, **config}
+    self.client = MockClient("mock", self.config)
+    self._thread = threading.Thread(
+        target=self.serve_forever, name=f"llm4time-mock-{port}", daemon=True)
+    self._thread.start()
+    logger.info(f"Mock server listening on {self.base_url}")
+
+  @property
+  def base_url(self) -> str:
+    host, port = self.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+  def stop(self) -> None:
+    self.shutdown()
+    self.server_close()
+    logger.info(f"Mock server on {self.base_url} stopped.")
+
+
+@st.cache_resource
+def _mock_servers() -> Dict[int, MockServer]:
+  return {}
+
+
+def start_mock_server(config: Dict[str, Any], port: int) -> MockServer:
+  """Start (or restart with `config`) the process-wide mock server on `port`."""
+  servers = _mock_servers()
+  stop_mock_server(port)
+  servers[port] = MockServer(config, MOCK_SERVER_HOST, port)
+  return servers[port]
+
+
+def stop_mock_server(port: int) -> None:
+  server = _mock_servers().pop(port, None)
+  if server is not None:
+    server.stop()
+
+
+def mock_servers() -> List[MockServer]:
+  return list(_mock_servers().values())
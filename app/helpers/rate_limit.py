@@ -0,0 +1,144 @@
+from config import (API_RPM, API_TPM, API_RATE_LIMITS, API_EXPECTED_OUTPUT_TOKENS,
+                    API_CHARS_PER_TOKEN)
+from collections import deque
+from typing import Any, Dict, List, Tuple
+import streamlit as st
+import threading
+import math
+import time
+
+
+def estimate_tokens(prompt: str, max_tokens: int | None = None) -> int:
+  """Tokens a call is expected to use: the prompt's, estimated, plus the output's."""
+  prompt_tokens = math.ceil(len(prompt) / API_CHARS_PER_TOKEN)
+  return prompt_tokens + (max_tokens or API_EXPECTED_OUTPUT_TOKENS)
+
+
+class TokenBucket:
+  """Refills at `rate` units per minute, up to a minute's worth (0 is unlimited)."""
+
+  def __init__(self, rate: float):
+    self.rate = rate
+    self.level = rate
+    self._updated = time.monotonic()
+
+  def _refill(self, now: float) -> None:
+    self.level = min(self.rate, self.level + (now - self._updated) * self.rate / 60)
+    self._updated = now
+
+  def wait_time(self, amount: float, now: float) -> float:
+    if not self.rate:
+      return 0.0
+    self._refill(now)
+    # A call larger than the bucket waits for a full bucket, instead of forever.
+    return max(0.0, (min(amount, self.rate) - self.level) * 60 / self.rate)
+
+  def take(self, amount: float, now: float) -> None:
+    if self.rate:
+      self._refill(now)
+      self.level -= min(amount, self.rate)
+
+  def adjust(self, amount: float) -> None:
+    if self.rate:
+      self.level = min(self.rate, self.level - amount)
+
+
+class RateLimiter:
+  """
+  Requests- and tokens-per-minute limits of one provider/model.
+
+  Calls are admitted in arrival order: each waits until the calls queued before
+  it were admitted and both buckets can cover it, so no caller is starved.
+  """
+
+  def __init__(self, rpm: float, tpm: float):
+    self.requests = TokenBucket(rpm)
+    self.tokens = TokenBucket(tpm)
+    self._cond = threading.Condition()
+    self._queue = deque()
+    self.admitted = 0
+    self.throttled = 0
+    self.waited = 0.0
+
+  def acquire(self, tokens: int) -> float:
+    """Block until a call using `tokens` may be made; returns the seconds waited."""
+    started_at = time.monotonic()
+    ticket = object()
+    with self._cond:
+      self._queue.append(ticket)
+      try:
+        while True:
+          now = time.monotonic()
+          wait = None
+          if self._queue[0] is ticket:
+            wait = max(self.requests.wait_time(1, now),
+                       self.tokens.wait_time(tokens, now))
+            if wait <= 0:
+              break
+          self._cond.wait(wait)
+        self.requests.take(1, now)
+        self.tokens.take(tokens, now)
+      finally:
+        self._queue.remove(ticket)
+        self._cond.notify_all()
+      waited = time.monotonic() - started_at
+      self.admitted += 1
+      if waited > 0.001:
+        self.throttled += 1
+        self.waited += waited
+    return waited
+
+  def settle(self, estimated: int, used: int) -> None:
+    """Correct the token bucket once the actual usage of a call is known."""
+    with self._cond:
+      self.tokens.adjust(used - estimated)
+      self._cond.notify_all()
+
+  def stats(self) -> Dict[str, Any]:
+    with self._cond:
+      return {
+          "rpm": self.requests.rate,
+          "tpm": self.tokens.rate,
+          "queued": len(self._queue),
+          "admitted": self.admitted,
+          "throttled": self.throttled,
+          "waited_s": self.waited,
+      }
+
+
+class RateLimiters:
+  """
+  Process-wide rate limiters, one per (provider, model).
+
+  Limits come from LLM4TIME_API_RATE_LIMITS under "<provider>/<model>", then
+  "<provider>", falling back to LLM4TIME_API_RPM and LLM4TIME_API_TPM.
+  """
+
+  def __init__(self):
+    self._limiters: Dict[Tuple[str, str], RateLimiter] = {}
+    self._lock = threading.Lock()
+
+  def get(self, provider: str, model: str) -> RateLimiter:
+    key = (str(provider), model)
+    with self._lock:
+      if key not in self._limiters:
+        limits = API_RATE_LIMITS.get(
+            f"{key[0]}/{model}", API_RATE_LIMITS.get(key[0], {}))
+        self._limiters[key] = RateLimiter(
+            limits.get("rpm", API_RPM), limits.get("tpm", API_TPM))
+      return self._limiters[key]
+
+  def stats(self) -> List[Dict[str, Any]]:
+    with self._lock:
+      items = list(self._limiters.items())
+    return [{"provider": provider, "model": model, **limiter.stats()}
+            for (provider, model), limiter in items]
+
+
+@st.cache_resource
+def rate_limiters() -> RateLimiters:
+  return RateLimiters()
+
+
+def rate_limiter_stats() -> List[Dict[str, Any]]:
+  return rate_limiters().stats()
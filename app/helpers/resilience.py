@@ -0,0 +1,243 @@
+from config import (API_TIMEOUT, API_RETRIES, API_BACKOFF, API_BACKOFF_MAX,
+                    API_CIRCUIT_THRESHOLD, API_CIRCUIT_COOLDOWN, API_PROVIDER_POLICIES,
+                    logger)
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Tuple
+import streamlit as st
+import threading
+import random
+import time
+import re
+
+# Exception class names of transient errors raised by the OpenAI SDK and httpx.
+TRANSIENT_ERROR_NAMES = (
+    "Timeout", "Connection", "RateLimit", "InternalServer", "ServiceUnavailable")
+
+
+class CircuitOpenError(Exception):
+  """Exception raised when a provider's circuit is open and calls fail fast."""
+  pass
+
+
+class RequestTimeoutError(TimeoutError):
+  """Exception raised when a call timed out but may still run in its worker thread."""
+  pass
+
+
+class RetryPolicy:
+  """Timeout, retry and circuit-breaker settings of a provider."""
+
+  def __init__(self, timeout: float = API_TIMEOUT, retries: int = API_RETRIES,
+               backoff: float = API_BACKOFF, backoff_max: float = API_BACKOFF_MAX,
+               failure_threshold: int = API_CIRCUIT_THRESHOLD,
+               cooldown: float = API_CIRCUIT_COOLDOWN):
+    self.timeout = timeout
+    self.retries = retries
+    self.backoff = backoff
+    self.backoff_max = backoff_max
+    self.failure_threshold = failure_threshold
+    self.cooldown = cooldown
+
+  @classmethod
+  def for_provider(cls, provider: str) -> "RetryPolicy":
+    return cls(**API_PROVIDER_POLICIES.get(str(provider), {}))
+
+  def delay(self, retry: int, retry_after: float | None = None) -> float:
+    """Seconds to wait before retry `retry` (from 1), honoring a Retry-After."""
+    if retry_after is not None:
+      return min(retry_after, self.backoff_max)
+    # Equal jitter: half of the exponential step, plus up to the other half at random.
+    step = min(self.backoff_max, self.backoff * 2 ** (retry - 1))
+    return step / 2 + random.uniform(0, step / 2)
+
+
+class CircuitBreaker:
+  """
+  Consecutive-failure circuit breaker of one provider endpoint.
+
+  After `failure_threshold` transient failures in a row the circuit opens and
+  calls fail fast for `cooldown` seconds. A single trial call is then let
+  through: it closes the circuit on success and reopens it on failure.
+  """
+
+  def __init__(self, failure_threshold: int, cooldown: float):
+    self.failure_threshold = failure_threshold
+    self.cooldown = cooldown
+    self._lock = threading.Lock()
+    self._opened_at = None
+    self._trial = False
+    self.failures = 0
+    self.rejected = 0
+
+  @property
+  def state(self) -> str:
+    with self._lock:
+      if self._opened_at is None:
+        return "closed"
+      if self._trial or time.monotonic() - self._opened_at < self.cooldown:
+        return "open"
+      return "half-open"
+
+  def allow(self) -> bool:
+    with self._lock:
+      if self._opened_at is None:
+        return True
+      if self._trial or time.monotonic() - self._opened_at < self.cooldown:
+        self.rejected += 1
+        return False
+      self._trial = True
+      return True
+
+  def success(self) -> None:
+    with self._lock:
+      self.failures = 0
+      self._opened_at = None
+      self._trial = False
+
+  def failure(self) -> None:
+    with self._lock:
+      self.failures += 1
+      tripped = self._opened_at is None and self.failures >= self.failure_threshold
+      if self._trial or tripped:
+        logger.warning(f"Circuit opened after {self.failures} consecutive failures.")
+        self._opened_at = time.monotonic()
+      self._trial = False
+
+
+class CircuitBreakers:
+  """Process-wide circuit breakers, one per (provider, endpoint)."""
+
+  def __init__(self):
+    self._breakers: Dict[Tuple, CircuitBreaker] = {}
+    self._lock = threading.Lock()
+
+  def get(self, key: Tuple, policy: RetryPolicy) -> CircuitBreaker:
+    with self._lock:
+      if key not in self._breakers:
+        self._breakers[key] = CircuitBreaker(policy.failure_threshold, policy.cooldown)
+      return self._breakers[key]
+
+  def stats(self) -> List[Dict[str, Any]]:
+    with self._lock:
+      items = list(self._breakers.items())
+    return [{
+        "provider": key[0],
+        "endpoint": key[1],
+        "state": breaker.state,
+        "failures": breaker.failures,
+        "rejected": breaker.rejected,
+    } for key, breaker in items]
+
+
+@st.cache_resource
+def circuit_breakers() -> CircuitBreakers:
+  return CircuitBreakers()
+
+
+def circuit_breaker_stats() -> List[Dict[str, Any]]:
+  return circuit_breakers().stats()
+
+
+def _status_code(error: Exception) -> int | None:
+  for source in (error, getattr(error, "response", None)):
+    code = getattr(source, "status_code", None)
+    if isinstance(code, int):
+      return code
+  # Wrapped SDK errors keep the status in their message ("Error code: 429 - ...").
+  match = re.search(r"\b(?:error code|status(?: code)?)[: ]+(\d{3})\b", str(error),
+                    re.IGNORECASE)
+  return int(match.group(1)) if match else None
+
+
+def is_transient(error: Exception) -> bool:
+  """Whether `error` is worth retrying: timeouts, connection errors, 429 and 5xx."""
+  if isinstance(error, (TimeoutError, ConnectionError)):
+    return True
+  code = _status_code(error)
+  if code is not None:
+    return code == 429 or code >= 500
+  return any(name in type(error).__name__ for name in TRANSIENT_ERROR_NAMES)
+
+
+def retry_after(error: Exception) -> float | None:
+  """Seconds requested by the server's Retry-After header, if the error carries one."""
+  headers = getattr(getattr(error, "response", None), "headers", None) or {}
+  try:
+    if headers.get("retry-after-ms") is not None:
+      return float(headers["retry-after-ms"]) / 1000
+    value = headers.get("retry-after")
+    if value is None:
+      return None
+    try:
+      return max(0.0, float(value))
+    except ValueError:
+      return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+  except (TypeError, ValueError):
+    return None
+
+
+def call_with_timeout(func: Callable[[], Any], timeout: float,
+                      executor: ThreadPoolExecutor | None = None) -> Any:
+  """
+  Run `func`, raising RequestTimeoutError after `timeout` seconds (0 waits forever).
+
+  The call runs in a worker thread, which is abandoned on timeout: the request
+  it made may still complete, so call_with_retries() does not retry it.
+  """
+  if not timeout:
+    return func()
+  owned = executor is None
+  executor = executor or ThreadPoolExecutor(
+      max_workers=1, thread_name_prefix="llm4time-call")
+  try:
+    return executor.submit(func).result(timeout=timeout)
+  except FutureTimeoutError:
+    raise RequestTimeoutError(f"No response after {timeout:g} seconds")
+  finally:
+    if owned:
+      executor.shutdown(wait=False)
+
+
+def call_with_retries(call: Callable[[], Any], policy: RetryPolicy,
+                      breaker: CircuitBreaker, stats: Dict[str, Any],
+                      retryable: Callable[[], bool] = lambda: True) -> Any:
+  """
+  Call `call` through `breaker`, retrying transient errors with `policy`'s backoff.
+
+  `stats` is updated with the number of `attempts` and the seconds spent in
+  `backoff`, also when the call finally fails. `retryable` can veto retries,
+  e.g. once part of a streamed response has been shown. Calls abandoned by
+  call_with_timeout() are not retried, since their request may still be in
+  flight, and neither are errors whose Retry-After exceeds `backoff_max`.
+  """
+  stats.setdefault("attempts", 0)
+  stats.setdefault("backoff", 0.0)
+  while True:
+    if not breaker.allow():
+      raise CircuitOpenError(
+          "Provider unavailable, circuit open after repeated failures.")
+    stats["attempts"] += 1
+    try:
+      result = call()
+    except Exception as e:
+      if not is_transient(e):
+        breaker.success()  # The provider answered; the request itself is at fault.
+        raise
+      breaker.failure()
+      if (isinstance(e, RequestTimeoutError) or stats["attempts"] > policy.retries
+          or not retryable() or breaker.state == "open"):
+        raise
+      wait = retry_after(e)
+      if wait is not None and wait > policy.backoff_max:
+        logger.warning(f"Server asked to retry in {wait:.0f} seconds, "
+                       f"more than {policy.backoff_max:g}.")
+        raise
+      delay = policy.delay(stats["attempts"], wait)
+      logger.warning(f"Attempt {stats['attempts']} failed ({e}), "
+                     f"retrying in {delay:.2f} seconds.")
+      time.sleep(delay)
+      stats["backoff"] += delay
+    else:
+      breaker.success()
+      return result
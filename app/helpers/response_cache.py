@@ -0,0 +1,168 @@
+import llm4time as l4t
+from config import RESPONSE_CACHE_PATH, RESPONSE_CACHE_MB, RESPONSE_CACHE_TTL, logger
+from storage.sqlite import connect
+from utils import abspath
+from typing import Any, Dict
+import streamlit as st
+import threading
+import hashlib
+import json
+import time
+
+
+def response_key(pool_key: tuple, temperature: float, prompt: str, **kwargs) -> str:
+  """
+  Cache key of a prediction: its client, temperature, extra kwargs and prompt hash.
+
+  The client is identified by its pool key (provider, model, endpoint or
+  configuration, API version) without the credential fingerprint.
+  """
+  provider, model, endpoint, api_version = pool_key[:4]
+  return hashlib.sha256(json.dumps({
+      "provider": str(provider),
+      "model": model,
+      "endpoint": endpoint,
+      "api_version": api_version,
+      "temperature": temperature,
+      "kwargs": kwargs,
+      "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+  }, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+  """
+  Model responses persisted in SQLite, shared by all sessions.
+
+  Entries older than `ttl` seconds (0 disables expiry) are ignored and removed.
+  Once the stored responses exceed `max_bytes`, the least recently used ones
+  are evicted. Only successful responses are stored. The stored size is kept
+  as a running total, so a put only scans entries when some must go.
+  """
+
+  def __init__(self, db_path: str, max_bytes: int, ttl: float):
+    self.db_path = db_path
+    self.max_bytes = max_bytes
+    self.ttl = ttl
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    with connect(self.db_path) as conn:
+      conn.execute(
+          'CREATE TABLE IF NOT EXISTS responses '
+          '(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, '
+          'created REAL NOT NULL, accessed REAL NOT NULL)')
+      conn.execute(
+          'CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+      conn.execute(
+          'CREATE INDEX IF NOT EXISTS responses_created ON responses (created)')
+      self._bytes = conn.execute(
+          'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+  def _expired(self, created: float, now: float) -> bool:
+    return self.ttl > 0 and now - created > self.ttl
+
+  def get(self, key: str) -> l4t.ModelResponse | None:
+    now = time.time()
+    with connect(self.db_path) as conn:
+      row = conn.execute(
+          'SELECT value, size, created FROM responses WHERE key = ?', (key,)).fetchone()
+      if row is not None and self._expired(row["created"], now):
+        conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+        with self._lock:
+          self._bytes -= row["size"]
+        row = None
+      if row is not None:
+        conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+    with self._lock:
+      if row is None:
+        self.misses += 1
+        return None
+      self.hits += 1
+    return l4t.ModelResponse(**json.loads(row["value"]))
+
+  def put(self, key: str, response: l4t.ModelResponse) -> None:
+    if response.predicted is None:
+      return
+    value = json.dumps({
+        "raw": response.raw,
+        "predicted": response.predicted,
+        "input_tokens": response.input_tokens,
+        "output_tokens": response.output_tokens,
+        "time": response.time,
+    })
+    now = time.time()
+    with connect(self.db_path) as conn:
+      replaced = conn.execute(
+          'SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+      conn.execute(
+          'INSERT OR REPLACE INTO responses (key, value, size, created, accessed) '
+          'VALUES (?, ?, ?, ?, ?)', (key, value, len(value), now, now))
+      with self._lock:
+        self._bytes += len(value) - (replaced["size"] if replaced else 0)
+      self._evict(conn, now)
+
+  def _evict(self, conn, now: float) -> None:
+    evicted = 0
+    if self.ttl > 0:
+      expired = conn.execute(
+          'SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes '
+          'FROM responses WHERE created < ?', (now - self.ttl,)).fetchone()
+      if expired["entries"]:
+        conn.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl,))
+        evicted += expired["entries"]
+        with self._lock:
+          self._bytes -= expired["bytes"]
+
+    with self._lock:
+      excess = self._bytes - self.max_bytes
+    if excess > 0:
+      keys, freed = [], 0
+      for row in conn.execute('SELECT key, size FROM responses ORDER BY accessed'):
+        if freed >= excess:
+          break
+        keys.append((row["key"],))
+        freed += row["size"]
+      conn.executemany('DELETE FROM responses WHERE key = ?', keys)
+      evicted += len(keys)
+      with self._lock:
+        self._bytes -= freed
+
+    if evicted:
+      with self._lock:
+        self.evictions += evicted
+      logger.info(f"Evicted {evicted} cached responses.")
+
+  def clear(self) -> None:
+    with connect(self.db_path) as conn:
+      conn.execute('DELETE FROM responses')
+    with self._lock:
+      self._bytes = 0
+
+  def stats(self) -> Dict[str, Any]:
+    with connect(self.db_path) as conn:
+      row = conn.execute(
+          'SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes '
+          'FROM responses').fetchone()
+    with self._lock:
+      total = self.hits + self.misses
+      return {
+          "entries": row["entries"],
+          "bytes": row["bytes"],
+          "max_bytes": self.max_bytes,
+          "ttl": self.ttl,
+          "hits": self.hits,
+          "misses": self.misses,
+          "evictions": self.evictions,
+          "hit_rate": self.hits / total if total else 0.0,
+      }
+
+
+@st.cache_resource
+def response_cache() -> ResponseCache:
+  return ResponseCache(abspath(RESPONSE_CACHE_PATH),
+                       int(RESPONSE_CACHE_MB * 1024 * 1024), RESPONSE_CACHE_TTL)
+
+
+def response_cache_stats() -> Dict[str, Any]:
+  return response_cache().stats()
@@ -0,0 +1,73 @@
+from typing import Any, Callable, Generator
+import llm4time as l4t
+import time
+import re
+
+_REASONING = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+
+
+def prediction_text(raw: str) -> str:
+  """The forecast in a model answer, without reasoning blocks or a code fence."""
+  text = _REASONING.sub("", raw)
+  fenced = _FENCE.findall(text)
+  return (fenced[-1] if fenced else text).strip()
+
+
+class StreamingClient:
+  """
+  An llm4time client that can also stream, through the provider's
+  OpenAI-compatible chat completions API.
+
+  predict() is the llm4time client's. stream() sends the prompt as a single
+  user message with `stream=True`, yields the text as it arrives and returns a
+  ModelResponse built from it, with the token counts reported by the last
+  chunk when `include_usage` is set (not every server supports it). The SDK
+  client is created on the first stream, so it is only built when used.
+  """
+
+  def __init__(self, client: Any, sdk: Callable[[], Any], model: str,
+               include_usage: bool = True):
+    self.client = client
+    self.model = model
+    self.include_usage = include_usage
+    self._sdk_factory = sdk
+    self._sdk = None
+
+  def predict(self, content: str, temperature: float = 0.7,
+              **kwargs) -> l4t.ModelResponse:
+    return self.client.predict(content, temperature=temperature, **kwargs)
+
+  def stream(self, content: str, temperature: float = 0.7,
+             **kwargs) -> Generator[str, None, l4t.ModelResponse]:
+    if self._sdk is None:
+      self._sdk = self._sdk_factory()
+    if self.include_usage:
+      kwargs.setdefault("stream_options", {"include_usage": True})
+    started_at = time.perf_counter()
+    events = self._sdk.chat.completions.create(
+        model=self.model,
+        messages=[{"role": "user", "content": content}],
+        temperature=temperature,
+        stream=True,
+        **kwargs
+    )
+    parts, usage = [], None
+    try:
+      for event in events:
+        usage = event.usage or usage
+        for choice in event.choices:
+          if choice.delta.content:
+            parts.append(choice.delta.content)
+            yield choice.delta.content
+    finally:
+      events.close()
+
+    raw = "".join(parts)
+    return l4t.ModelResponse(
+        raw=raw,
+        predicted=prediction_text(raw),
+        input_tokens=usage.prompt_tokens if usage else None,
+        output_tokens=usage.completion_tokens if usage else None,
+        time=time.perf_counter() - started_at
+    )
@@ -0,0 +1,90 @@
+import streamlit as st
+import storage
+import pandas as pd
+import json
+from helpers import (circuit_breaker_stats, client_pool_stats, dataset_cache_stats,
+                     rate_limiter_stats, response_cache_stats)
+
+
+with st.sidebar:
+  if st.button("Reset Counters", width="stretch",
+               help="Clear the storage operation statistics of this server process."):
+    storage.reset_operation_stats()
+
+operations = storage.operation_stats()
+
+st.write("#### STORAGE OPERATIONS")
+st.caption("Collected by this server process across all sessions. "
+           "Numeric ids in keys are grouped as `*`.")
+if operations:
+  df = pd.DataFrame(operations)
+  df["mean_ms"] = df["mean_s"] * 1000
+  df["max_ms"] = df["max_s"] * 1000
+  df["total_ms"] = df["total_s"] * 1000
+  df["KB"] = df["bytes"] / 1024
+  st.dataframe(
+      df[["component", "operation", "key", "calls",
+          "mean_ms", "max_ms", "total_ms", "KB"]],
+      hide_index=True,
+      width="stretch",
+      column_config={
+          "mean_ms": st.column_config.NumberColumn("Mean (ms)", format="%.2f"),
+          "max_ms": st.column_config.NumberColumn("Max (ms)", format="%.2f"),
+          "total_ms": st.column_config.NumberColumn("Total (ms)", format="%.1f"),
+          "KB": st.column_config.NumberColumn("Payload (KB)", format="%.1f"),
+      }
+  )
+
+  st.write("##### LATENCY HISTOGRAM")
+  labels = [f"≤ {b * 1000:g} ms" for b in storage.LATENCY_BUCKETS]
+  labels.append(f"> {storage.LATENCY_BUCKETS[-1] * 1000:g} ms")
+  histogram = pd.DataFrame(
+      [op["histogram"] for op in operations],
+      columns=labels,
+      index=[f"{op['component']}.{op['operation']} {op['key']}".strip()
+             for op in operations])
+  st.dataframe(histogram, width="stretch")
+else:
+  st.info("No storage operations recorded yet.")
+
+st.write("#### CACHES")
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+  st.write("##### LOCAL STORAGE (this session)")
+  st.json(storage.LocalStorage.cache_stats())
+with col2:
+  st.write("##### DATASETS (shared)")
+  st.json(dataset_cache_stats())
+with col3:
+  st.write("##### MODEL CLIENTS (shared)")
+  st.json(client_pool_stats())
+with col4:
+  st.write("##### MODEL RESPONSES (shared)")
+  st.json(response_cache_stats())
+
+st.write("#### MODEL PROVIDERS")
+st.caption("Circuit breakers of the provider endpoints called by this server process.")
+breakers = circuit_breaker_stats()
+if breakers:
+  st.dataframe(pd.DataFrame(breakers), hide_index=True, width="stretch")
+else:
+  st.info("No model calls made yet.")
+limiters = rate_limiter_stats()
+if limiters:
+  st.write("##### RATE LIMITS")
+  st.dataframe(pd.DataFrame(limiters), hide_index=True, width="stretch")
+
+dump = json.loads(storage.dump_operation_stats())
+dump["local_storage_cache"] = storage.LocalStorage.cache_stats()
+dump["dataset_cache"] = dataset_cache_stats()
+dump["client_pool"] = client_pool_stats()
+dump["response_cache"] = response_cache_stats()
+dump["circuit_breakers"] = breakers
+dump["rate_limiters"] = limiters
+st.download_button(
+    label="Download JSON",
+    data=json.dumps(dump, indent=2),
+    file_name="storage_diagnostics.json",
+    mime="application/json",
+    type="primary"
+)
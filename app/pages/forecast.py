@@ -1,11 +1,9 @@
-import base64
 import streamlit as st
 import llm4time as l4t
 import pandas as pd
-from helpers import crud, API
+from helpers import crud, load_dataset, response_metadata, API
 from utils import abspath
-from config import logger
-import io
+from config import RESPONSE_CACHE, logger
 
 
 with st.sidebar:
@@ -20,6 +18,10 @@ with st.sidebar:
       label="Temperature", min_value=0.0, max_value=1.0, value=0.7, step=0.1,
       help="Temperature controls the randomness of the model's response. Higher values result in more creative and varied responses.")
 
+  use_cache = st.toggle(
+      label="Use Response Cache", value=RESPONSE_CACHE,
+      help="Reuse the stored response of an identical request (model, temperature and prompt) instead of calling the model again. Above temperature 0 this replays the same sample on every run.")
+
   st.write("---")
   st.write(f"#### ⚙️ Prompt Settings")
 
@@ -28,15 +30,22 @@ with st.sidebar:
   filename = st.selectbox("Dataset", filenames)
 
   if filename:
-    selected_file = next((f for f in files if f.get("filename") == filename), None)
-    content_bytes = base64.b64decode(selected_file["content"])
-    ts = l4t.read_file(pd.read_csv(io.BytesIO(content_bytes)), index_col="datetime")
-    ts = l4t.MultiTimeSeries(ts)
-
-    columns = st.multiselect("Select one or more columns", ts.columns.tolist())
-
-    min_date = ts.index.min().date()
-    max_date = ts.index.max().date()
+    # Columns and date range come from the metadata stored at upload; the data
+    # itself is only loaded once the analysis is requested.
+    metadata = crud.crud_files().metadata(filename) or {}
+    if not all(metadata.get(k) for k in ("dtypes", "start_date", "end_date")):
+      # Missing or incomplete for some older uploads: describe the parsed dataset.
+      data = load_dataset(filename)
+      if data is not None:
+        metadata = {**metadata, **crud.crud_files().describe(data)}
+    if metadata.get("start_date") is None or metadata.get("end_date") is None:
+      st.toast(f"No dates could be read from '{filename}'.", icon='⚠️')
+      st.stop()
+
+    columns = st.multiselect("Select one or more columns", list(metadata.get("dtypes") or {}))
+
+    min_date = pd.Timestamp(metadata["start_date"]).date()
+    max_date = pd.Timestamp(metadata["end_date"]).date()
     min_end_date = min(min_date + pd.Timedelta(days=2), max_date)
 
     start_date = str(st.date_input(
@@ -83,11 +92,13 @@ with st.sidebar:
         label="Series Type", options=list(l4t.TSType), index=0, format_func=lambda f: f.name,
         help="In the numeric series, the values are passed as [3.662, 3.124, 3.465, 3.609], while in the text series, the values are passed as [3 . 6 6 2, 3 . 1 2 4, 3 . 4 6 5, 3 . 6 0 9].")
 
-    ts = ts[columns]
-    train, val = ts.split(start=start_date, end=end_date, periods=horizon_forecast)
-
   confirm = st.button("Generate Analysis", type="primary", width="stretch")
 
+if confirm and filename and columns:
+  ts = load_dataset(filename)
+  ts = ts[columns]
+  train, val = ts.split(start=start_date, end=end_date, periods=horizon_forecast)
+
 
 if not confirm:
   st.write('## LLM4Time Pipeline')
@@ -199,29 +210,42 @@ else:
   st.write("---")
   st.write("#### FORECAST RESULTS")
   try:
-    api = API(model_name, provider)
-    response = api.response(content=prompt, temperature=temperature)
-    # response = API._mock(val, tsformat, tstype)
-    pred = l4t.from_str(response.predicted, format=tsformat)
-    pred = l4t.MultiTimeSeries(pred)
-    pred.columns = val.columns
-    pred.index = val.index
-
-    col1, col2, col3 = st.columns(3)
-    with col1:
-      st.metric(label="INPUT TOKENS", value=response.input_tokens)
-    with col2:
-      st.metric(label="OUTPUT TOKENS", value=response.output_tokens)
-    with col3:
-      st.metric(label="RESPONSE TIME", value=f"{response.time:.2f} seconds")
-
+    metrics_container = st.container()
     with st.expander("MODEL RESPONSE", expanded=True):
       with st.chat_message("user"):
         st.write("###### User")
         st.code(prompt, language="json", height=600)
       with st.chat_message("assistant"):
         st.write("###### Model")
-        st.code(response.raw, language="json5")
+        output = st.empty()
+
+    # The response is rendered as it is generated, then replaced by the full text.
+    streamed = []
+
+    def on_token(chunk: str) -> None:
+      streamed.append(chunk)
+      output.code("".join(streamed), language="json5")
+
+    api = API(model_name, provider, reference=(val, tsformat, tstype))
+    response = api.stream(content=prompt, temperature=temperature, on_token=on_token, cache=use_cache)
+    ttft = response_metadata(response).get("ttft")
+    output.code(response.raw, language="json5")
+
+    with metrics_container:
+      col1, col2, col3, col4 = st.columns(4)
+      with col1:
+        st.metric(label="INPUT TOKENS", value=response.input_tokens)
+      with col2:
+        st.metric(label="OUTPUT TOKENS", value=response.output_tokens)
+      with col3:
+        st.metric(label="FIRST TOKEN", value=f"{ttft:.2f} seconds" if ttft is not None else "-")
+      with col4:
+        st.metric(label="RESPONSE TIME", value=f"{response.time:.2f} seconds")
+
+    pred = l4t.from_str(response.predicted, format=tsformat)
+    pred = l4t.MultiTimeSeries(pred)
+    pred.columns = val.columns
+    pred.index = val.index
 
     st.plotly_chart(
         l4t.lineplot(
@@ -285,6 +309,8 @@ else:
         input_tokens=response.input_tokens,
         output_tokens=response.output_tokens,
         response_time=response.time,
+        ttft=ttft,
+        cached=response_metadata(response).get("cached", False),
         response_raw=response.raw,
         response_predicted=pred.to_str(format="csv"),
         validation=val.to_str(format="csv"),
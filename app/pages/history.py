@@ -2,6 +2,7 @@ import streamlit as st
 import llm4time as l4t
 import pandas as pd
 from helpers import crud
+from config import HISTORY_PAGE_SIZE
 
 
 @st.dialog("Confirm deletion")
@@ -50,9 +51,6 @@ with st.sidebar:
       help='Select the prompt types you want to view. You can select more than one prompt type to compare results.'
   )
 
-  if filename and prompt_types:
-    st.session_state.history = crud.crud_history().select(filename, prompt_types)
-
   confirm_view_history = st.button(
       type="primary",
       label="View History",
@@ -76,15 +74,40 @@ elif confirm_clear_history:
   delete_dialog(filename, prompt_types)
 
 elif confirm_view_history:
-  history = st.session_state.history
-  for i, result in enumerate(history[::-1]):
-    with st.expander(f"**{i+1} • `{result[4]}` / `{result[1]}` / `{result[2]}` / `{result[3]}` / `{result[8]}` / `{result[9]}` / `{result[10]}`**", expanded=False):
+  st.session_state.view_history = (filename, prompt_types)
+  # Cursors of the pages opened so far; the last one is the current page.
+  st.session_state.history_cursors = [None]
+
+if filename and prompt_types and st.session_state.get("view_history") == (filename, prompt_types):
+  cursors = st.session_state.history_cursors
+  total = crud.crud_history().count(filename, prompt_types)
+  history, next_cursor = crud.crud_history().select_page(
+      filename, prompt_types, cursor=cursors[-1], limit=HISTORY_PAGE_SIZE)
+  offset = (len(cursors) - 1) * HISTORY_PAGE_SIZE
+  for i, result in enumerate(history, start=offset):
+    with st.expander(f"**{i+1} • `{result.dataset}` / `{result.model}` / `{result.provider}` / `{result.temperature}` / `{result.prompt_type}` / `{result.tsformat}` / `{result.tstype}`**", expanded=False):
+      col1, col2, col3, col4 = st.columns(4)
+      with col1:
+        st.metric(label="INPUT TOKENS", value=result.input_tokens)
+      with col2:
+        st.metric(label="OUTPUT TOKENS", value=result.output_tokens)
+      with col3:
+        st.metric(label="FIRST TOKEN",
+                  value=f"{result.ttft:.2f} seconds" if result.ttft is not None else "-")
+      with col4:
+        st.metric(label="RESPONSE TIME", value=f"{result.response_time:.2f} seconds",
+                  delta="cached" if result.cached else None, delta_color="off")
+
+      # Training set, prompt and responses are only loaded for opened records.
+      if not st.toggle("Show details", key=f"details_{result.id}"):
+        continue
+
       with st.expander("TRAINING SET", expanded=False):
-        train = l4t.from_str(result[23], format="csv")
+        train = l4t.from_str(result.training, format="csv")
         train = l4t.MultiTimeSeries(train)
         col1, col2, col3, col4, col5 = st.columns([3, 3, 3, 2, 1])
         with col1:
-          st.metric("Dataset", result[4])
+          st.metric("Dataset", result.dataset)
         with col2:
           st.metric("Start Date", train.index.min().strftime("%Y-%m-%d"))
         with col3:
@@ -101,7 +124,7 @@ elif confirm_view_history:
                 lightness=0.7
             ),
             width="stretch",
-            key=f"train_linechart_{i}"
+            key=f"train_linechart_{result.id}"
         )
         st.dataframe(train, width="stretch")
 
@@ -114,7 +137,7 @@ elif confirm_view_history:
                 lightness=0.7
             ),
             width="stretch",
-            key=f"train_barplot_{i}"
+            key=f"train_barplot_{result.id}"
         )
         st.dataframe(train.describe().T, width="stretch")
 
@@ -129,22 +152,14 @@ elif confirm_view_history:
       with st.expander(f"MODEL RESPONSE", expanded=False):
         with st.chat_message("user"):
           st.write("###### User")
-          st.code(result[24], language="json", height=600)
+          st.code(result.prompt, language="json", height=600)
         with st.chat_message("assistant"):
           st.write("###### Model")
-          st.code(result[17], language="json5")
+          st.code(result.response_raw, language="json5")
 
       with st.expander("FORECAST RESULTS", expanded=False):
-        col1, col2, col3 = st.columns(3)
-        with col1:
-          st.metric(label="INPUT TOKENS", value=result[14])
-        with col2:
-          st.metric(label="OUTPUT TOKENS", value=result[15])
-        with col3:
-          st.metric(label="RESPONSE TIME", value=f"{result[16]:.2f} seconds")
-
-        val = l4t.from_str(result[19], format="csv")
-        pred = l4t.from_str(result[18], format="csv")
+        val = l4t.from_str(result.validation, format="csv")
+        pred = l4t.from_str(result.response_predicted, format="csv")
         st.plotly_chart(
             l4t.lineplot(
                 val, pred,
@@ -152,7 +167,7 @@ elif confirm_view_history:
                 title="Time Series - Real vs Predicted"
             ),
             width="stretch",
-            key=f"forecast_linechart_{i}"
+            key=f"forecast_linechart_{result.id}"
         )
         col1, col2 = st.columns(2)
         with col1:
@@ -170,7 +185,7 @@ elif confirm_view_history:
                 yaxis_type="log"
             ),
             width="stretch",
-            key=f"forecast_barplot_{i}"
+            key=f"forecast_barplot_{result.id}"
         )
         col1, col2 = st.columns(2)
         with col1:
@@ -189,6 +204,17 @@ elif confirm_view_history:
                 yaxis_type="log"
             ),
             width="stretch",
-            key=f"forecast_metrics_{i}"
+            key=f"forecast_metrics_{result.id}"
         )
         st.dataframe(metrics, width="stretch")
+
+  col1, col2, col3 = st.columns([1, 2, 1])
+  with col1:
+    st.button("Previous", width="stretch", disabled=len(cursors) == 1,
+              on_click=cursors.pop)
+  with col2:
+    pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+    st.caption(f"Page {len(cursors)} of {pages} • {total} forecasts")
+  with col3:
+    st.button("Next", width="stretch", disabled=next_cursor is None,
+              on_click=cursors.append, args=(next_cursor,))
@@ -1,9 +1,12 @@
 import streamlit as st
 import llm4time as l4t
 import pandas as pd
-from helpers import crud
+import json
+from helpers import (crud, invalidate_credentials, MOCK_PROVIDER, MOCK_DEFAULTS,
+                     LATENCY_DISTRIBUTIONS, start_mock_server, stop_mock_server, mock_servers)
+from config import MOCK_SERVER_PORT
 from utils import normalize
-from storage.cookies import set_cookie, rename_cookie, delete_cookie
+from storage.cookies import set_cookies, rename_cookie, delete_cookies, cookie_batch
 import storage.exceptions as exceptions
 from streamlit_theme import st_theme
 
@@ -72,8 +75,10 @@ if "save_settings" in st.session_state and st.session_state.save_settings:
       try:
         save_model(provider=st.session_state.provider, name=st.session_state.model)
         prefix = normalize(f"{st.session_state.provider}_{st.session_state.model}")
-        set_cookie(f"{prefix}:api_key", st.session_state.api_key, expires=30*24*60*60)
-        set_cookie(f"{prefix}:base_url", st.session_state.base_url, expires=30*24*60*60)
+        set_cookies({
+            f"{prefix}:api_key": st.session_state.api_key,
+            f"{prefix}:base_url": st.session_state.base_url,
+        }, expires=30*24*60*60)
       except:
         st.toast("Error saving settings.", icon="❌")
       finally:
@@ -83,16 +88,29 @@ if "save_settings" in st.session_state and st.session_state.save_settings:
       try:
         save_model(provider=st.session_state.provider, name=st.session_state.model)
         prefix = normalize(f"{st.session_state.provider}_{st.session_state.model}")
-        set_cookie(f"{prefix}:api_key", st.session_state.api_key, expires=30*24*60*60)
-        set_cookie(f"{prefix}:endpoint", st.session_state.endpoint, expires=30*24*60*60)
-        set_cookie(f"{prefix}:api_version",
-                   st.session_state.api_version, expires=30*24*60*60)
+        set_cookies({
+            f"{prefix}:api_key": st.session_state.api_key,
+            f"{prefix}:endpoint": st.session_state.endpoint,
+            f"{prefix}:api_version": st.session_state.api_version,
+        }, expires=30*24*60*60)
       except:
         st.toast("Error saving settings.", icon="❌")
       finally:
         del st.session_state.api_key
         del st.session_state.endpoint
         del st.session_state.api_version
+    elif st.session_state.provider == MOCK_PROVIDER:
+      try:
+        save_model(provider=st.session_state.provider, name=st.session_state.model)
+        prefix = normalize(f"{st.session_state.provider}_{st.session_state.model}")
+        set_cookies({
+            f"{prefix}:config": json.dumps(st.session_state.mock_config),
+        }, expires=30*24*60*60)
+      except:
+        st.toast("Error saving settings.", icon="❌")
+      finally:
+        del st.session_state.mock_config
+    invalidate_credentials(st.session_state.provider, st.session_state.model)
     del st.session_state.provider
     del st.session_state.save_settings
     st.rerun()
@@ -100,23 +118,29 @@ if "save_settings" in st.session_state and st.session_state.save_settings:
 
 if "rename_model" in st.session_state and st.session_state.rename_model:
   try:
-    rename_model(
-        old_name=st.session_state.old_model,
-        new_name=st.session_state.new_model,
-        provider=st.session_state.provider
-    )
+    with crud.batch():
+      rename_model(
+          old_name=st.session_state.old_model,
+          new_name=st.session_state.new_model,
+          provider=st.session_state.provider
+      )
     old_prefix = normalize(f"{st.session_state.provider}_{st.session_state.old_model}")
     new_prefix = normalize(f"{st.session_state.provider}_{st.session_state.new_model}")
-    if st.session_state.provider == str(l4t.Provider.OPENAI):
-      rename_cookie(f"{old_prefix}:api_key", f"{new_prefix}:api_key")
-      rename_cookie(f"{old_prefix}:base_url", f"{new_prefix}:base_url")
-    elif st.session_state.provider == str(l4t.Provider.AZURE):
-      rename_cookie(f"{old_prefix}:api_key", f"{new_prefix}:api_key")
-      rename_cookie(f"{old_prefix}:endpoint", f"{new_prefix}:endpoint")
-      rename_cookie(f"{old_prefix}:api_version", f"{new_prefix}:api_version")
+    with cookie_batch():
+      if st.session_state.provider == str(l4t.Provider.OPENAI):
+        rename_cookie(f"{old_prefix}:api_key", f"{new_prefix}:api_key")
+        rename_cookie(f"{old_prefix}:base_url", f"{new_prefix}:base_url")
+      elif st.session_state.provider == str(l4t.Provider.AZURE):
+        rename_cookie(f"{old_prefix}:api_key", f"{new_prefix}:api_key")
+        rename_cookie(f"{old_prefix}:endpoint", f"{new_prefix}:endpoint")
+        rename_cookie(f"{old_prefix}:api_version", f"{new_prefix}:api_version")
+      elif st.session_state.provider == MOCK_PROVIDER:
+        rename_cookie(f"{old_prefix}:config", f"{new_prefix}:config")
   except Exception:
     st.toast("Error renaming model.", icon="❌")
   finally:
+    invalidate_credentials(st.session_state.provider, st.session_state.old_model)
+    invalidate_credentials(st.session_state.provider, st.session_state.new_model)
     del st.session_state.rename_model
     del st.session_state.old_model
     del st.session_state.new_model
@@ -126,19 +150,23 @@ if "rename_model" in st.session_state and st.session_state.rename_model:
 if "confirm_delete" in st.session_state and st.session_state.confirm_delete:
   if "models_to_delete" in st.session_state:
     try:
-      delete_models(st.session_state.models_to_delete)
-      for model, provider in st.session_state.models_to_delete:
-        prefix = normalize(f"{provider}_{model}")
-        delete_cookie(f"{prefix}:api_key")
-        delete_cookie(f"{prefix}:base_url")
+      with crud.batch():
+        delete_models(st.session_state.models_to_delete)
+      delete_cookies([
+          f"{normalize(f'{provider}_{model}')}:{field}"
+          for model, provider in st.session_state.models_to_delete
+          for field in ("api_key", "base_url", "endpoint", "api_version", "config")])
     except Exception:
       st.toast("Error deleting models.", icon="❌")
     finally:
+      for model, provider in st.session_state.models_to_delete:
+        invalidate_credentials(provider, model)
       del st.session_state.models_to_delete
       st.rerun()
   elif "prompts_to_delete" in st.session_state:
     try:
-      delete_prompts(st.session_state.prompts_to_delete)
+      with crud.batch():
+        delete_prompts(st.session_state.prompts_to_delete)
     except Exception:
       st.toast("Error deleting prompts.", icon="❌")
     finally:
@@ -153,7 +181,7 @@ if "mode" not in st.session_state:
 
 st.write(f"### API")
 with st.container(key="api-tabs"):
-  col1, col2, col3 = st.columns(3)
+  col1, col2, col3, col4 = st.columns(4)
   with col1:
     selected = st.session_state.mode == l4t.Provider.LM_STUDIO
     if st.button("LM Studio", type="primary" if selected else "tertiary", width="stretch"):
@@ -169,6 +197,11 @@ with st.container(key="api-tabs"):
     if st.button("OpenAI Azure", type="primary" if selected else "tertiary", width="stretch"):
       st.session_state.mode = l4t.Provider.AZURE
       st.rerun()
+  with col4:
+    selected = st.session_state.mode == MOCK_PROVIDER
+    if st.button("Mock", type="primary" if selected else "tertiary", width="stretch"):
+      st.session_state.mode = MOCK_PROVIDER
+      st.rerun()
 
 if st.session_state.mode == l4t.Provider.LM_STUDIO:
   st.write(
@@ -264,6 +297,99 @@ elif st.session_state.mode == l4t.Provider.AZURE:
     st.session_state.provider = str(l4t.Provider.AZURE)
     st.rerun()
 
+elif st.session_state.mode == MOCK_PROVIDER:
+  st.write(
+      "A local stand-in for a model, to benchmark the forecast and history pipeline "
+      "offline. It answers with the validation series plus noise."
+  )
+  model = st.text_input(
+      label="Model",
+      placeholder="mock-forecaster",
+      help="Enter a name for this mock configuration."
+  )
+  col1, col2, col3 = st.columns(3)
+  with col1:
+    latency = st.selectbox(
+        label="Latency Distribution",
+        options=LATENCY_DISTRIBUTIONS,
+        index=LATENCY_DISTRIBUTIONS.index(MOCK_DEFAULTS["latency"]),
+        help="Distribution of the time to first token.")
+  with col2:
+    latency_mean = st.number_input(
+        label="Mean Latency (s)", min_value=0.0, value=MOCK_DEFAULTS["latency_mean"], step=0.1,
+        help="Mean time to first token, in seconds.")
+  with col3:
+    latency_spread = st.number_input(
+        label="Latency Spread", min_value=0.0, value=MOCK_DEFAULTS["latency_spread"], step=0.1,
+        help="Half-width in seconds of the uniform distribution, or sigma of the lognormal one.")
+  col1, col2, col3 = st.columns(3)
+  with col1:
+    tokens_per_second = st.number_input(
+        label="Tokens per Second", min_value=0.0, value=MOCK_DEFAULTS["tokens_per_second"], step=10.0,
+        help="Output rate of the response; 0 returns it at once.")
+  with col2:
+    error_rate = st.slider(
+        label="Error Rate", min_value=0.0, max_value=1.0, value=MOCK_DEFAULTS["error_rate"], step=0.05,
+        help="Share of calls that fail with the error status.")
+  with col3:
+    error_status = st.selectbox(
+        label="Error Status", options=[429, 500, 503, 400],
+        index=[429, 500, 503, 400].index(MOCK_DEFAULTS["error_status"]),
+        help="HTTP status of the injected errors. 429 and 5xx are retried, 400 is not.")
+  col1, col2 = st.columns(2)
+  with col1:
+    seed = st.number_input(
+        label="Seed", min_value=0, value=MOCK_DEFAULTS["seed"], step=1,
+        help="Calls with the same seed, run, prompt and data return the same latency, errors and output.")
+  with col2:
+    run = st.number_input(
+        label="Run", min_value=0, value=MOCK_DEFAULTS["run"], step=1,
+        help="Change to draw a new sample of every prompt with the same seed.")
+  mock_config = {
+      **MOCK_DEFAULTS,
+      "latency": latency,
+      "latency_mean": latency_mean,
+      "latency_spread": latency_spread,
+      "tokens_per_second": tokens_per_second,
+      "error_rate": error_rate,
+      "error_status": error_status,
+      "seed": int(seed),
+      "run": int(run),
+  }
+  confirm = st.button(
+      type="primary",
+      label="💾 Save Settings",
+      help="Click to save the settings."
+  )
+  if confirm and not model:
+    st.toast("Please fill in all fields before saving the settings.", icon="⚠️")
+  elif confirm:
+    st.session_state.save_settings = True
+    st.session_state.mock_config = mock_config
+    st.session_state.model = model
+    st.session_state.provider = MOCK_PROVIDER
+    st.rerun()
+
+  with st.expander("OpenAI-compatible HTTP stand-in"):
+    st.write(
+        "Serves the configuration above as a chat completions endpoint of this server. "
+        "Add it as an **OpenAI / Ollama** model with its base URL to also exercise the "
+        "network path of the real client."
+    )
+    port = st.number_input("Port", min_value=1024, max_value=65535, value=MOCK_SERVER_PORT, step=1)
+    col1, col2 = st.columns(2)
+    with col1:
+      if st.button("▶️ Start", width="stretch"):
+        try:
+          start_mock_server(mock_config, int(port))
+        except OSError as e:
+          st.toast(f"Could not start the mock server: {e}", icon="❌")
+    with col2:
+      if st.button("⏹️ Stop", width="stretch"):
+        stop_mock_server(int(port))
+    for server in mock_servers():
+      st.caption(f"Running: `{server.base_url}`")
+
 
 # ---------------- All models ----------------
 
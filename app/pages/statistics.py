@@ -1,21 +1,15 @@
 import streamlit as st
-import llm4time as l4t
-from helpers import crud
+from helpers import crud, load_dataset
 import pandas as pd
-import base64
-import io
 
 
 with st.sidebar:
   files = crud.crud_files().select_all()
   filenames = [file["filename"] for file in files]
   filename = st.selectbox("Dataset", filenames)
-  selected_file = next((f for f in files if f.get("filename") == filename), None)
+  df = load_dataset(filename) if filename else None
 
-  if selected_file is not None:
-    content_bytes = base64.b64decode(selected_file["content"])
-    df = l4t.read_file(pd.read_csv(io.BytesIO(content_bytes)), index_col="datetime")
-    df = l4t.MultiTimeSeries(df)
+  if df is not None:
     columns = st.multiselect("Select one or more columns", df.num_columns)
 
   confirm = st.button("Generate Statistics", type="primary", width="stretch")
@@ -3,7 +3,6 @@ import llm4time as l4t
 from helpers import crud
 from datetime import datetime
 import pandas as pd
-import base64
 import io
 import os
 
@@ -208,6 +207,7 @@ def upload_dialog(df: pd.DataFrame) -> None:
     buffer = io.BytesIO(csv_str.encode("utf-8"))
     buffer.name = st.session_state.file
     st.session_state.buffer = buffer
+    st.session_state.metadata = crud.crud_files().describe(ts.reset_index())
     st.session_state.upload = True
 
   col1, col2 = st.columns(2)
@@ -233,10 +233,11 @@ def upload_dialog(df: pd.DataFrame) -> None:
 
 
 if "upload" in st.session_state and st.session_state.upload:
-  crud.crud_files().upload(st.session_state.buffer)
+  crud.crud_files().upload(st.session_state.buffer, st.session_state.metadata)
   st.toast(f"File '{st.session_state.file}' uploaded successfully!", icon="✅")
   del st.session_state.upload
   del st.session_state.buffer
+  del st.session_state.metadata
 
 
 @st.dialog("Confirm deletion")
@@ -341,9 +342,11 @@ files = crud.crud_files().select_all()
 if files:
   for file in files:
     filename = file.get("filename", "Unknown")
-    content = file.get("content")
+    if "rows" not in file:
+      # Uploaded before metadata was stored with the file.
+      file = crud.crud_files().metadata(filename) or file
 
-    if not content:
+    if "rows" not in file:
       files_info.append({
           "File": f"📁 {filename}",
           "Extension": "N/A",
@@ -355,27 +358,14 @@ if files:
       })
       continue
 
-    try:
-      content_bytes = base64.b64decode(content)
-      file_size_mb = round(len(content_bytes) / (1024 * 1024), 2)
-      mod_date = datetime.now().strftime("%d/%m/%Y %H:%M")
-      file_extension = f".{filename.split('.')[-1].upper()}" if "." in filename else "CSV"
-      df = pd.read_csv(io.BytesIO(content_bytes))
-      row_count, col_count = df.shape
-    except Exception:
-      file_size_mb = "N/A"
-      mod_date = "N/A"
-      file_extension = "N/A"
-      row_count = "N/A"
-      col_count = "N/A"
-
+    uploaded_at = file.get("uploaded_at")
     files_info.append({
         "File": f"📁 {filename}",
-        "Extension": file_extension,
-        "Rows": row_count,
-        "Columns": col_count,
-        "Size (MB)": file_size_mb,
-        "Modification": mod_date,
+        "Extension": f".{filename.split('.')[-1].upper()}" if "." in filename else "CSV",
+        "Rows": file["rows"],
+        "Columns": file["columns"],
+        "Size (MB)": round(file.get("size", 0) / (1024 * 1024), 2),
+        "Modification": datetime.fromisoformat(uploaded_at).strftime("%d/%m/%Y %H:%M") if uploaded_at else "N/A",
         "Delete": False
     })
 
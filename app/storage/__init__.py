@@ -1,8 +1,17 @@
+from .aggregate import *
+from .arrow_history import *
 from .base import *
 from .cookies import *
+from .disk_files import *
 from .exceptions import *
+from .history_records import *
+from .instrumentation import *
 from .local_files import *
 from .local_storage import *
 from .local_history import *
 from .local_models import *
 from .local_prompts import *
+from .sqlite_files import *
+from .sqlite_history import *
+from .sqlite_models import *
+from .sqlite_prompts import *
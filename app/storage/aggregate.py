@@ -0,0 +1,40 @@
+from typing import Any, Dict, List
+
+METRIC_FIELDS = {"smape": "sMAPE", "mae": "MAE", "rmse": "RMSE"}
+
+
+def flatten_metrics(metrics: List[Dict[str, Any]] | None) -> Dict[str, float | None]:
+  """
+  Average the per-column metrics stored by pages/forecast.py.
+
+  `metrics` is `val.metrics(pred).to_dict(orient="records")`, one entry per
+  series column, and is reduced to top-level `smape`, `mae` and `rmse` values.
+  """
+  flat = {}
+  for field, label in METRIC_FIELDS.items():
+    values = [m[label] for m in metrics or [] if m.get(label) is not None]
+    flat[field] = sum(values) / len(values) if values else None
+  return flat
+
+
+def group_records(records: List[Dict[str, Any]],
+                  columns: List[str]) -> List[Dict[str, Any]]:
+  """Group history records by `columns` with the run count and mean metrics."""
+  groups = {}
+  for r in records:
+    metrics = flatten_metrics(r.get("metrics"))
+    if all(v is None for v in metrics.values()):
+      continue
+    key = tuple(r.get(c) for c in columns)
+    groups.setdefault(key, []).append(metrics)
+
+  results = []
+  for key in sorted(groups, key=lambda k: tuple((v is None, str(v)) for v in k)):
+    rows = groups[key]
+    result = dict(zip(columns, key))
+    result["count"] = len(rows)
+    for field in METRIC_FIELDS:
+      values = [m[field] for m in rows if m[field] is not None]
+      result[field] = sum(values) / len(values) if values else None
+    results.append(result)
+  return results
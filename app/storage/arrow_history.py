@@ -0,0 +1,274 @@
+from typing import Any, Dict, List, Tuple
+from .base import BaseHistoryStorage, PAYLOAD_FIELDS
+from .exceptions import HistoryNotFoundError
+from .history_records import SUMMARY_COLUMNS, HistoryResultSet
+from .aggregate import flatten_metrics
+from config import logger
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pyarrow as pa
+import threading
+import gzip
+import json
+import os
+
+# Summary columns kept in the Parquet table, with `columns` and `metrics` as
+# JSON text. The payload fields (series as CSV, prompt, raw response,
+# statistics) go to the per-record blob store.
+SCALAR_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("model", pa.string()),
+    ("provider", pa.string()),
+    ("temperature", pa.float64()),
+    ("dataset", pa.string()),
+    ("columns", pa.string()),
+    ("start_date", pa.string()),
+    ("end_date", pa.string()),
+    ("prompt_type", pa.string()),
+    ("tsformat", pa.string()),
+    ("tstype", pa.string()),
+    ("examples", pa.int64()),
+    ("sampling", pa.string()),
+    ("horizon_forecast", pa.int64()),
+    ("input_tokens", pa.int64()),
+    ("output_tokens", pa.int64()),
+    ("response_time", pa.float64()),
+    ("ttft", pa.float64()),
+    ("cached", pa.bool_()),
+    ("metrics", pa.string()),
+    ("smape", pa.float64()),
+    ("mae", pa.float64()),
+    ("rmse", pa.float64()),
+])
+
+JSON_COLUMNS = ("columns", "metrics")
+
+# Inserts written as part files before they are merged into the main table.
+COMPACT_PARTS = 64
+
+_lock = threading.Lock()
+_tables: Dict[str, pa.Table] = {}
+
+
+class ArrowHistoryStorage(BaseHistoryStorage):
+  """
+  Server-side history with the record summaries in a Parquet table.
+
+  The table is loaded once per process and filtered/grouped with Arrow compute
+  kernels. Each insert is written as a one-row part file (`parts/<id>.parquet`)
+  instead of rewriting the table; every COMPACT_PARTS inserts, and on removals,
+  the parts are merged into `history.parquet`. Payload fields live in
+  `blobs/<id>.json.gz` and are read one record at a time by payload().
+  """
+
+  def __init__(self, root: str):
+    self.root = root
+    self.table_path = os.path.join(root, "history.parquet")
+    self.parts_path = os.path.join(root, "parts")
+    self.blobs_path = os.path.join(root, "blobs")
+    os.makedirs(self.parts_path, exist_ok=True)
+    os.makedirs(self.blobs_path, exist_ok=True)
+
+  def _part_files(self) -> List[str]:
+    names = [n for n in os.listdir(self.parts_path) if n.endswith(".parquet")]
+    names = sorted(names, key=lambda n: int(n.split(".")[0]))
+    return [os.path.join(self.parts_path, n) for n in names]
+
+  def _load(self) -> pa.Table:
+    if self.table_path not in _tables:
+      if os.path.exists(self.table_path):
+        table = pq.read_table(self.table_path)
+      else:
+        table = SCALAR_SCHEMA.empty_table()
+      parts = [pq.read_table(path) for path in self._part_files()]
+      if parts:
+        parts = pa.concat_tables(parts)
+        # Parts already merged by a compaction interrupted before deleting them.
+        merged = pc.is_in(parts["id"], value_set=table["id"].combine_chunks())
+        parts = parts.filter(pc.invert(merged))
+        table = pa.concat_tables([table, parts])
+      _tables[self.table_path] = table
+    return _tables[self.table_path]
+
+  def _snapshot(self) -> pa.Table:
+    """The current table for readers; writers replace it under the lock."""
+    with _lock:
+      return self._load()
+
+  @staticmethod
+  def _dump(value: Any) -> str | None:
+    return None if value is None else json.dumps(value)
+
+  def _save(self, table: pa.Table) -> None:
+    """Write the whole table to the main file and drop the parts it now contains."""
+    table = table.combine_chunks()
+    tmp_path = f"{self.table_path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, self.table_path)
+    for path in self._part_files():
+      os.remove(path)
+    _tables[self.table_path] = table
+
+  def _append(self, table: pa.Table, row: pa.Table) -> None:
+    path = os.path.join(self.parts_path, f"{row['id'][0].as_py()}.parquet")
+    pq.write_table(row, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    table = pa.concat_tables([table, row])
+    if len(self._part_files()) >= COMPACT_PARTS:
+      self._save(table)
+    else:
+      _tables[self.table_path] = table
+
+  def _blob_path(self, record_id: int) -> str:
+    return os.path.join(self.blobs_path, f"{record_id}.json.gz")
+
+  def _remove_blobs(self, record_ids: List[int]) -> None:
+    for record_id in record_ids:
+      path = self._blob_path(record_id)
+      if os.path.exists(path):
+        os.remove(path)
+
+  def _read_blob(self, record_id: int) -> Dict[str, Any]:
+    path = self._blob_path(record_id)
+    if not os.path.exists(path):
+      return {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+      return json.load(f)
+
+  def payload(self, record_id: int) -> Dict[str, Any]:
+    try:
+      blob = self._read_blob(record_id)
+      return {k: v for k, v in blob.items() if k in PAYLOAD_FIELDS}
+    except Exception as e:
+      logger.error(f"Error loading record payload: {e}")
+      return {}
+
+  def _mask(self, table: pa.Table, dataset: str,
+            prompt_types: List[str]) -> pa.ChunkedArray:
+    return pc.and_(
+        pc.equal(table["dataset"], dataset),
+        pc.is_in(table["prompt_type"], value_set=pa.array(prompt_types, pa.string())))
+
+  def insert(self, **kwargs) -> bool:
+    try:
+      with _lock:
+        table = self._load()
+        record_id = (pc.max(table["id"]).as_py() or 0) + 1
+        row = {name: kwargs.get(name) for name in SCALAR_SCHEMA.names}
+        row.update(flatten_metrics(kwargs.get("metrics")))
+        row.update({c: self._dump(kwargs.get(c)) for c in JSON_COLUMNS})
+        row["id"] = record_id
+        blob = {k: v for k, v in kwargs.items() if k not in SCALAR_SCHEMA.names}
+
+        with gzip.open(self._blob_path(record_id), "wt", encoding="utf-8") as f:
+          json.dump(blob, f)
+        self._append(table, pa.Table.from_pylist([row], SCALAR_SCHEMA))
+      logger.info("Record inserted successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error inserting record: {e}")
+      raise
+
+  @staticmethod
+  def _rows(table: pa.Table) -> List[Dict[str, Any]]:
+    rows = table.select(SUMMARY_COLUMNS).to_pylist()
+    for row in rows:
+      for column in JSON_COLUMNS:
+        if row[column] is not None:
+          row[column] = json.loads(row[column])
+    return rows
+
+  def summaries(self, dataset: str, prompt_types: List[str]) -> List[Dict[str, Any]]:
+    try:
+      table = self._snapshot()
+      return self._rows(table.filter(self._mask(table, dataset, prompt_types)))
+    except Exception as e:
+      logger.error(f"Error selecting records: {e}")
+      return []
+
+  def select_page(
+      self, dataset: str, prompt_types: List[str], cursor: int | None = None,
+      limit: int = 20, order: str = "desc") -> Tuple[HistoryResultSet, int | None]:
+    try:
+      self._validate_page(limit, order)
+      table = self._snapshot()
+      mask = self._mask(table, dataset, prompt_types)
+      if cursor is not None:
+        compare = pc.less if order == "desc" else pc.greater
+        mask = pc.and_(mask, compare(table["id"], cursor))
+      direction = "descending" if order == "desc" else "ascending"
+      table = table.filter(mask).sort_by([("id", direction)])
+      rows = self._rows(table.slice(0, limit + 1))
+      return HistoryResultSet.from_page(rows, limit, self.payload)
+    except Exception as e:
+      logger.error(f"Error selecting records: {e}")
+      raise
+
+  def count(self, dataset: str, prompt_types: List[str]) -> int:
+    table = self._snapshot()
+    return pc.sum(self._mask(table, dataset, prompt_types)).as_py() or 0
+
+  def select(self, dataset: str, prompt_types: List[str]) -> HistoryResultSet:
+    return HistoryResultSet.from_summaries(
+        self.summaries(dataset, prompt_types), self.payload)
+
+  def group_by(self, columns: List[str]) -> List[Dict]:
+    try:
+      if not columns:
+        raise ValueError("Columns list cannot be empty.")
+      table = self._snapshot()
+      table = table.filter(pc.invert(pc.is_null(table["smape"])))
+      grouped = table.group_by(columns).aggregate([
+          ("id", "count"),
+          ("smape", "mean"),
+          ("mae", "mean"),
+          ("rmse", "mean"),
+      ])
+      names = {"id_count": "count", "smape_mean": "smape",
+               "mae_mean": "mae", "rmse_mean": "rmse"}
+      grouped = grouped.rename_columns([names.get(n, n) for n in grouped.column_names])
+      return grouped.sort_by([(c, "ascending") for c in columns]).to_pylist()
+    except Exception as e:
+      logger.error(f"Error grouping records: {e}")
+      return []
+
+  def remove(self, record_id: int) -> bool:
+    try:
+      with _lock:
+        table = self._load()
+        updated = table.filter(pc.not_equal(table["id"], record_id))
+        if updated.num_rows == table.num_rows:
+          raise HistoryNotFoundError(f"Record with id {record_id} not found.")
+        self._save(updated)
+        self._remove_blobs([record_id])
+      logger.info(f"Record {record_id} removed successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error removing record: {e}")
+      raise
+
+  def remove_many(self, dataset: str, prompt_types: List[str]) -> bool:
+    try:
+      with _lock:
+        table = self._load()
+        mask = self._mask(table, dataset, prompt_types)
+        removed = table.filter(mask)["id"].to_pylist()
+        self._save(table.filter(pc.invert(mask)))
+        self._remove_blobs(removed)
+      logger.info("Records removed successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error removing records: {e}")
+      raise
+
+  def remove_all(self) -> bool:
+    try:
+      with _lock:
+        removed = self._load()["id"].to_pylist()
+        self._save(SCALAR_SCHEMA.empty_table())
+        self._remove_blobs(removed)
+      logger.info("All records removed successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error clearing history: {e}")
+      raise
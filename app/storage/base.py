@@ -1,5 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Tuple, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Optional
+from datetime import datetime
+import pandas as pd
+import hashlib
+import io
+
+if TYPE_CHECKING:
+  from .history_records import HistoryResultSet
+
+# Large fields of a forecast record. History backends keep them out of the
+# summary index and load them one record at a time through payload().
+PAYLOAD_FIELDS = ("training", "validation", "response_predicted", "response_raw",
+                  "prompt", "statistics_val", "statistics_pred")
 
 
 class BaseHistoryStorage(ABC):
@@ -8,11 +20,43 @@ class BaseHistoryStorage(ABC):
     pass
 
   @abstractmethod
-  def select(self, dataset: str, prompt_types: List[str]) -> List[Dict[str, Any]]:
+  def select(self, dataset: str, prompt_types: List[str]) -> "HistoryResultSet":
+    pass
+
+  @abstractmethod
+  def select_page(self, dataset: str, prompt_types: List[str], cursor: int | None = None,
+                  limit: int = 20, order: str = "desc") -> Tuple["HistoryResultSet", int | None]:
+    """
+    Return up to `limit` records after `cursor` and the cursor of the next page.
+
+    Records are ordered by id, newest first for `order="desc"`. The cursor is the
+    id of the last record of the previous page (None for the first page), so
+    pages stay stable while new records are inserted. The returned cursor is
+    None on the last page.
+    """
+    pass
+
+  @abstractmethod
+  def count(self, dataset: str, prompt_types: List[str]) -> int:
+    pass
+
+  @staticmethod
+  def _validate_page(limit: int, order: str) -> None:
+    if order not in ("asc", "desc"):
+      raise ValueError(f"Invalid order '{order}', expected 'asc' or 'desc'.")
+    if limit < 1:
+      raise ValueError("Page limit must be at least 1.")
+
+  @abstractmethod
+  def summaries(self, dataset: str, prompt_types: List[str]) -> List[Dict[str, Any]]:
+    pass
+
+  @abstractmethod
+  def payload(self, record_id: int) -> Dict[str, Any]:
     pass
 
   @abstractmethod
-  def group_by(self, columns: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+  def group_by(self, columns: List[str]) -> List[Dict[str, Any]]:
     pass
 
   @abstractmethod
@@ -33,6 +77,10 @@ class BaseModelsStorage(ABC):
   def insert(self, name: str, provider: str) -> bool:
     pass
 
+  @abstractmethod
+  def get(self, name: str, provider: str) -> Optional[Dict]:
+    pass
+
   @abstractmethod
   def select(self, provider: str) -> List[Dict]:
     pass
@@ -78,3 +126,83 @@ class BasePromptsStorage(ABC):
   @abstractmethod
   def rename(self, old_name: str, new_name: str) -> bool:
     pass
+
+
+class BaseFilesStorage(ABC):
+  @abstractmethod
+  def upload(self, file, metadata: Dict[str, Any] | None = None) -> None:
+    pass
+
+  @abstractmethod
+  def select_all(self) -> List[Dict[str, Any]]:
+    pass
+
+  @staticmethod
+  def describe(df: pd.DataFrame) -> Dict[str, Any]:
+    """Shape, value dtypes, datetime range and frequency of a dataset with a `datetime` column."""
+    values = df.drop(columns="datetime", errors="ignore")
+    index = df["datetime"] if "datetime" in df.columns else df.index
+    index = pd.DatetimeIndex(pd.to_datetime(index, errors="coerce")).dropna()
+    try:
+      freq = pd.infer_freq(index)
+    except (TypeError, ValueError):
+      freq = None
+    return {
+        "rows": int(df.shape[0]),
+        "columns": int(df.shape[1]),
+        "dtypes": {str(c): str(t) for c, t in values.dtypes.items()},
+        "start_date": index.min().isoformat() if len(index) else None,
+        "end_date": index.max().isoformat() if len(index) else None,
+        "freq": freq,
+    }
+
+  def _metadata(self, data: bytes, metadata: Dict[str, Any] | None) -> Dict[str, Any]:
+    if metadata is None:
+      metadata = self.describe(pd.read_csv(io.BytesIO(data)))
+    return {
+        **metadata,
+        "size": len(data),
+        "hash": hashlib.sha256(data).hexdigest(),
+        "uploaded_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+  def metadata(self, name: str) -> Dict[str, Any] | None:
+    """Stored metadata of `name`, computed from its content for files uploaded without it."""
+    record = next((f for f in self.select_all() if f.get("filename") == name), None)
+    if record is None or "rows" in record:
+      return record
+    df = self.read_frame(name)
+    return record if df is None else {**self.describe(df), **record}
+
+  @abstractmethod
+  def update_metadata(self, name: str, fields: Dict[str, Any]) -> bool:
+    """Merge `fields` into the stored metadata of `name`; False if there is no such file."""
+    pass
+
+  @abstractmethod
+  def read(self, name: str) -> bytes | None:
+    pass
+
+  def read_frame(self, name: str) -> pd.DataFrame | None:
+    content = self.read(name)
+    return None if content is None else pd.read_csv(io.BytesIO(content))
+
+  @abstractmethod
+  def exists(self, name: str) -> bool:
+    pass
+
+  @abstractmethod
+  def rename(self, old_name: str, new_name: str) -> bool:
+    pass
+
+  @abstractmethod
+  def remove(self, name: str) -> None:
+    pass
+
+  @abstractmethod
+  def remove_many(self, names: List[str]) -> None:
+    pass
+
+  @abstractmethod
+  def clear(self) -> None:
+    pass
@@ -0,0 +1,68 @@
+import base64
+import gzip
+
+try:
+  import zstandard
+except ImportError:
+  zstandard = None
+
+# Encoded values start with a marker naming the codec. Values without a marker
+# were written before compression existed: plain base64 for bytes and plain
+# text for strings.
+_MARKER = "l4t+"
+_MIN_TEXT_SIZE = 256
+
+
+def _compress(data: bytes) -> tuple[str, bytes]:
+  if zstandard is not None:
+    return "zstd", zstandard.ZstdCompressor(level=9).compress(data)
+  return "gzip", gzip.compress(data, compresslevel=6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+  match codec:
+    case "zstd":
+      if zstandard is None:
+        raise RuntimeError("The 'zstandard' package is required to read this value.")
+      return zstandard.ZstdDecompressor().decompress(data)
+    case "gzip":
+      return gzip.decompress(data)
+    case _:
+      raise ValueError(f"Unknown codec: {codec}")
+
+
+def _split(value: str) -> tuple[str, str] | None:
+  if not value.startswith(_MARKER):
+    return None
+  codec, _, payload = value[len(_MARKER):].partition(":")
+  return codec, payload
+
+
+def encode_bytes(data: bytes) -> str:
+  """Compress `data` and return it as a marked base64 string."""
+  codec, compressed = _compress(data)
+  if len(compressed) >= len(data):
+    return base64.b64encode(data).decode("ascii")
+  return f"{_MARKER}{codec}:{base64.b64encode(compressed).decode('ascii')}"
+
+
+def decode_bytes(value: str) -> bytes:
+  parts = _split(value)
+  if parts is None:
+    return base64.b64decode(value)
+  codec, payload = parts
+  return _decompress(codec, base64.b64decode(payload))
+
+
+def encode_text(value: str | None) -> str | None:
+  """Compress long strings. Short strings and None are stored unchanged."""
+  if value is None or len(value) < _MIN_TEXT_SIZE:
+    return value
+  encoded = encode_bytes(value.encode("utf-8"))
+  return encoded if len(encoded) < len(value) else value
+
+
+def decode_text(value: str | None) -> str | None:
+  if not isinstance(value, str) or _split(value) is None:
+    return value
+  return decode_bytes(value).decode("utf-8")
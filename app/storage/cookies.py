@@ -1,38 +1,111 @@
 from streamlit_cookies_controller import CookieController
+from contextlib import contextmanager
+from config import COOKIES_WRITE_DELAY
+from .instrumentation import timed, payload_size
+from typing import Dict, Iterator, List
+import streamlit as st
 import time
 
-controller = CookieController()
+# Cookie writes buffered by an open cookie_batch() block.
+_BATCH_KEY = "_cookies_batch"
+
+
+def _controller() -> CookieController:
+  # The controller keeps its cookies in session state, so it must be created per
+  # session rather than once at import time.
+  return CookieController()
+
+
+def _snapshot() -> dict:
+  """
+  Cookies of the current session, served from memory.
+
+  The controller loads every cookie with a single getAll() when the session
+  starts and keeps the dict updated on set/remove, so reads never need to wait
+  for the browser.
+  """
+  return _controller().getAll()
+
+
+def _flush(writes: List[tuple]) -> None:
+  if not writes:
+    return
+  with timed("cookies", "flush"):
+    controller = _controller()
+    cookies = controller.getAll()
+    for method, key, value, expires in writes:
+      with timed("cookies", method, key) as sample:
+        if method == "set":
+          sample["bytes"] = payload_size(value)
+          controller.set(key, value, max_age=expires)
+        elif key in cookies:
+          controller.remove(key)
+    # The component has no completion signal; give the browser one chance to
+    # apply the whole flush before a rerun can unmount it.
+    time.sleep(COOKIES_WRITE_DELAY)
+
+
+def _write(method: str, key: str, value: str | None = None, expires: int | None = None) -> None:
+  batch = st.session_state.get(_BATCH_KEY)
+  if batch is None:
+    _flush([(method, key, value, expires)])
+  else:
+    batch.append((method, key, value, expires))
+
+
+@contextmanager
+def cookie_batch() -> Iterator[None]:
+  """Buffer cookie writes made inside the block and flush them together on exit."""
+  if _BATCH_KEY in st.session_state:
+    yield
+    return
+  st.session_state[_BATCH_KEY] = []
+  try:
+    yield
+  finally:
+    _flush(st.session_state.pop(_BATCH_KEY))
 
 
 def set_cookie(key: str, value: str, expires: int | None = None) -> None:
-  controller.set(key, value, max_age=expires)
-  time.sleep(1)
+  _write("set", key, value, expires)
+
+
+def set_cookies(values: Dict[str, str], expires: int | None = None) -> None:
+  with cookie_batch():
+    for key, value in values.items():
+      set_cookie(key, value, expires)
 
 
 def get_cookie(key: str, default=None) -> str | None:
-  data = controller.get(key) or default
-  time.sleep(1)
-  return data
+  with timed("cookies", "get", key):
+    batch = st.session_state.get(_BATCH_KEY) or []
+    for method, name, value, _ in reversed(batch):
+      if name == key:
+        return value if method == "set" else default
+    return _snapshot().get(key) or default
 
 
 def delete_cookie(key: str) -> None:
-  controller.remove(key)
-  time.sleep(1)
+  _write("delete", key)
+
+
+def delete_cookies(keys: List[str]) -> None:
+  with cookie_batch():
+    for key in keys:
+      delete_cookie(key)
 
 
 def rename_cookie(old_key: str, new_key: str) -> None:
   value = get_cookie(old_key)
   if value is not None:
-    set_cookie(new_key, value)
-    delete_cookie(old_key)
+    with cookie_batch():
+      set_cookie(new_key, value)
+      delete_cookie(old_key)
 
 
 def clear_cookies() -> None:
-  for key in controller.getAll().keys():
-    delete_cookie(key)
+  delete_cookies(list(_snapshot().keys()))
 
 
 def all_cookies() -> dict:
-  data = controller.getAll()
-  time.sleep(1)
-  return data
+  return dict(_snapshot())
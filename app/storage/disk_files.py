@@ -0,0 +1,164 @@
+from typing import Any, Dict, List
+from .base import BaseFilesStorage
+import pyarrow as pa
+import pandas as pd
+import threading
+import hashlib
+import json
+import io
+import os
+
+_lock = threading.Lock()
+
+
+class DiskFilesStorage(BaseFilesStorage):
+  """
+  Uploaded files kept on the server, addressed by the SHA-256 of their content.
+
+  Each distinct dataset is kept as uploaded (`<hash>.csv`), which read()
+  returns, and parsed once into an Arrow IPC file (`<hash>.arrow`), which
+  read_frame() memory-maps instead of parsing the CSV again. The conversion to
+  pandas still copies the columns. Identical uploads under different names
+  share the files. `index.json` maps filenames to hashes.
+  """
+
+  def __init__(self, root: str):
+    self.root = root
+    self.index_path = os.path.join(root, "index.json")
+    os.makedirs(root, exist_ok=True)
+
+  def _blob_path(self, digest: str) -> str:
+    return os.path.join(self.root, f"{digest}.arrow")
+
+  def _raw_path(self, digest: str) -> str:
+    return os.path.join(self.root, f"{digest}.csv")
+
+  def _load(self) -> List[Dict[str, Any]]:
+    if not os.path.exists(self.index_path):
+      return []
+    with open(self.index_path, "r", encoding="utf-8") as f:
+      return json.load(f)
+
+  def _save(self, records: List[Dict[str, Any]]) -> None:
+    tmp_path = f"{self.index_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+      json.dump(records, f)
+    os.replace(tmp_path, self.index_path)
+
+  def _collect(self, removed: List[Dict[str, Any]], kept: List[Dict[str, Any]]) -> None:
+    referenced = {r["hash"] for r in kept}
+    for digest in {r["hash"] for r in removed} - referenced:
+      for path in (self._blob_path(digest), self._raw_path(digest)):
+        if os.path.exists(path):
+          os.remove(path)
+
+  def upload(self, file, metadata: Dict[str, Any] | None = None) -> None:
+    data = file.read()
+    metadata = self._metadata(data, metadata)
+    digest = hashlib.sha256(data).hexdigest()
+    raw_path = self._raw_path(digest)
+    path = self._blob_path(digest)
+    # Parsing is the slow part and runs unlocked; the blobs are written under the
+    # lock together with the index, so _collect never sees them unreferenced.
+    table = None
+    if not os.path.exists(path):
+      table = pa.Table.from_pandas(
+          pd.read_csv(io.BytesIO(data)), preserve_index=False)
+
+    with _lock:
+      if not os.path.exists(raw_path):
+        with open(f"{raw_path}.tmp", "wb") as f:
+          f.write(data)
+        os.replace(f"{raw_path}.tmp", raw_path)
+      if not os.path.exists(path):
+        if table is None:
+          table = pa.Table.from_pandas(
+              pd.read_csv(io.BytesIO(data)), preserve_index=False)
+        tmp_path = f"{path}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+          with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+      records = self._load()
+      replaced = [r for r in records if r["filename"] == file.name]
+      records = [r for r in records if r["filename"] != file.name]
+      records.append({
+          "id": max((r["id"] for r in records), default=0) + 1,
+          "filename": file.name,
+          **metadata,
+      })
+      self._save(records)
+      self._collect(replaced, records)
+
+  def select_all(self) -> List[Dict[str, Any]]:
+    return self._load()
+
+  def _find(self, name: str) -> Dict[str, Any] | None:
+    return next((r for r in self._load() if r["filename"] == name), None)
+
+  def read_table(self, name: str) -> pa.Table | None:
+    record = self._find(name)
+    if record is None:
+      return None
+    # The table's buffers point into the mapping, which stays open while they live.
+    source = pa.memory_map(self._blob_path(record["hash"]), "r")
+    return pa.ipc.open_file(source).read_all()
+
+  def read_frame(self, name: str) -> pd.DataFrame | None:
+    table = self.read_table(name)
+    return None if table is None else table.to_pandas()
+
+  def update_metadata(self, name: str, fields: Dict[str, Any]) -> bool:
+    with _lock:
+      records = self._load()
+      updated = False
+      for r in records:
+        if r["filename"] == name:
+          r.update(fields)
+          updated = True
+      if updated:
+        self._save(records)
+      return updated
+
+  def read(self, name: str) -> bytes | None:
+    record = self._find(name)
+    if record is None:
+      return None
+    path = self._raw_path(record["hash"])
+    if os.path.exists(path):
+      with open(path, "rb") as f:
+        return f.read()
+    # Stored before uploads were kept as is: export the parsed table.
+    return self.read_frame(name).to_csv(index=False).encode("utf-8")
+
+  def exists(self, name: str) -> bool:
+    return self._find(name) is not None
+
+  def rename(self, old_name: str, new_name: str) -> bool:
+    with _lock:
+      records = self._load()
+      renamed = False
+      for r in records:
+        if r["filename"] == old_name:
+          r["filename"] = new_name
+          renamed = True
+      if renamed:
+        self._save(records)
+      return renamed
+
+  def remove(self, name: str) -> None:
+    self.remove_many([name])
+
+  def remove_many(self, names: List[str]) -> None:
+    with _lock:
+      records = self._load()
+      removed = [r for r in records if r["filename"] in names]
+      kept = [r for r in records if r["filename"] not in names]
+      self._save(kept)
+      self._collect(removed, kept)
+
+  def clear(self) -> None:
+    with _lock:
+      records = self._load()
+      self._save([])
+      self._collect(records, [])
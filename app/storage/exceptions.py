@@ -36,3 +36,13 @@ class PromptNotFoundError(Exception):
 class PromptAlreadyExistsError(Exception):
   """Exception raised when trying to insert a prompt that already exists."""
   pass
+
+
+class StorageNotReadyError(Exception):
+  """
+  Exception raised when writing to the browser storage before it has been read.
+
+  The browser's localStorage only reaches the session on the rerun after the
+  first one, and a write computed from the empty view would overwrite it.
+  """
+  pass
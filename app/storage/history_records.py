@@ -0,0 +1,140 @@
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from .base import PAYLOAD_FIELDS
+from .aggregate import METRIC_FIELDS, flatten_metrics
+import pandas as pd
+import numpy as np
+
+# Fields of a forecast record in the order written by pages/forecast.py, with
+# their SQLite column types.
+HISTORY_COLUMNS = {
+    "model": "TEXT",
+    "provider": "TEXT",
+    "temperature": "REAL",
+    "dataset": "TEXT",
+    "columns": "TEXT",
+    "start_date": "TEXT",
+    "end_date": "TEXT",
+    "prompt_type": "TEXT",
+    "tsformat": "TEXT",
+    "tstype": "TEXT",
+    "examples": "INTEGER",
+    "sampling": "TEXT",
+    "horizon_forecast": "INTEGER",
+    "input_tokens": "INTEGER",
+    "output_tokens": "INTEGER",
+    "response_time": "REAL",
+    "ttft": "REAL",
+    "cached": "INTEGER",
+    "response_raw": "TEXT",
+    "response_predicted": "TEXT",
+    "validation": "TEXT",
+    "metrics": "TEXT",
+    "statistics_val": "TEXT",
+    "statistics_pred": "TEXT",
+    "training": "TEXT",
+    "prompt": "TEXT",
+}
+
+SUMMARY_COLUMNS = ["id", *(c for c in HISTORY_COLUMNS if c not in PAYLOAD_FIELDS)]
+
+
+def _payload_field(name: str) -> property:
+  return property(lambda self: self._load_payload().get(name))
+
+
+class HistoryRecord:
+  """
+  One forecast of the history.
+
+  Summary fields are plain attributes. Payload fields are fetched through
+  `loader(id)` on first access and then kept on the record.
+  """
+
+  __slots__ = (*SUMMARY_COLUMNS, "_loader", "_payload")
+
+  def __init__(self, loader: Callable[[int], Dict[str, Any]] | None = None, **fields):
+    for name in SUMMARY_COLUMNS:
+      setattr(self, name, fields.get(name))
+    payload = {k: v for k, v in fields.items() if k in PAYLOAD_FIELDS}
+    self._payload = payload or None
+    self._loader = loader
+
+  training = _payload_field("training")
+  validation = _payload_field("validation")
+  response_predicted = _payload_field("response_predicted")
+  response_raw = _payload_field("response_raw")
+  prompt = _payload_field("prompt")
+  statistics_val = _payload_field("statistics_val")
+  statistics_pred = _payload_field("statistics_pred")
+
+  def _load_payload(self) -> Dict[str, Any]:
+    if self._payload is None:
+      self._payload = self._loader(self.id) if self._loader else {}
+    return self._payload
+
+  def summary(self) -> Dict[str, Any]:
+    return {name: getattr(self, name) for name in SUMMARY_COLUMNS}
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {**self.summary(), **{name: getattr(self, name) for name in PAYLOAD_FIELDS}}
+
+  def __repr__(self) -> str:
+    return (f"HistoryRecord(id={self.id}, model={self.model!r}, "
+            f"prompt_type={self.prompt_type!r})")
+
+
+class HistoryResultSet:
+  """
+  Records returned by `BaseHistoryStorage.select()`.
+
+  `frame` exposes the summary columns (plus averaged `smape`, `mae` and `rmse`)
+  as a DataFrame aligned with the records, so `filter()` and `sort_by()` work
+  on vectorized masks and orderings. Payload fields stay unloaded until read.
+  """
+
+  def __init__(self, records: List[HistoryRecord]):
+    self.records = records
+    self._frame = None
+
+  @classmethod
+  def from_summaries(cls, summaries: List[Dict[str, Any]],
+                     loader: Callable[[int], Dict[str, Any]]) -> "HistoryResultSet":
+    return cls([HistoryRecord(loader, **summary) for summary in summaries])
+
+  @classmethod
+  def from_page(
+      cls, summaries: List[Dict[str, Any]], limit: int,
+      loader: Callable[[int], Dict[str, Any]]) -> Tuple["HistoryResultSet", int | None]:
+    """A page from up to `limit + 1` ordered summaries, the extra one marking more."""
+    cursor = summaries[limit - 1]["id"] if len(summaries) > limit else None
+    return cls.from_summaries(summaries[:limit], loader), cursor
+
+  @property
+  def frame(self) -> pd.DataFrame:
+    if self._frame is None:
+      rows = [{**r.summary(), **flatten_metrics(r.metrics)} for r in self.records]
+      self._frame = pd.DataFrame(rows, columns=[*SUMMARY_COLUMNS, *METRIC_FIELDS])
+    return self._frame
+
+  def filter(self, mask: pd.Series | np.ndarray | Callable[[pd.DataFrame], Any]
+             ) -> "HistoryResultSet":
+    """Keep the records where `mask` (or `mask(frame)`) is true."""
+    if callable(mask):
+      mask = mask(self.frame)
+    positions = np.flatnonzero(np.asarray(mask, dtype=bool))
+    return HistoryResultSet([self.records[i] for i in positions])
+
+  def sort_by(self, columns: str | List[str],
+              ascending: bool | List[bool] = True) -> "HistoryResultSet":
+    order = self.frame.reset_index(drop=True).sort_values(
+        columns, ascending=ascending, kind="stable").index
+    return HistoryResultSet([self.records[i] for i in order])
+
+  def __len__(self) -> int:
+    return len(self.records)
+
+  def __iter__(self) -> Iterator[HistoryRecord]:
+    return iter(self.records)
+
+  def __getitem__(self, index: int) -> HistoryRecord:
+    return self.records[index]
@@ -0,0 +1,107 @@
+from typing import Any, Callable, Dict, Iterator, List
+from contextlib import contextmanager
+import functools
+import threading
+import json
+import time
+import re
+
+# Upper bounds, in seconds, of the latency histogram buckets. The last bucket
+# counts everything slower than the last bound.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_lock = threading.Lock()
+_stats: Dict[tuple, Dict[str, Any]] = {}
+
+
+def _key_family(key: str | None) -> str:
+  # Segment, chunk and payload keys carry numeric ids (`history:3`,
+  # `uploads:file:2:0`); they are aggregated per family (`history:*`).
+  return "" if key is None else re.sub(r"(?<=:)\d+(?=:|$)", "*", str(key))
+
+
+def payload_size(value: Any) -> int:
+  """Size in bytes of `value` as serialized for the browser."""
+  if value is None:
+    return 0
+  if isinstance(value, bytes):
+    return len(value)
+  if not isinstance(value, str):
+    value = json.dumps(value, default=str)
+  return len(value.encode("utf-8"))
+
+
+def record_operation(component: str, operation: str, key: str | None,
+                     seconds: float, nbytes: int = 0) -> None:
+  """Add one call of `component.operation` on `key` to the process-wide stats."""
+  bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+                len(LATENCY_BUCKETS))
+  with _lock:
+    stats = _stats.setdefault((component, operation, _key_family(key)), {
+        "calls": 0,
+        "total_s": 0.0,
+        "max_s": 0.0,
+        "bytes": 0,
+        "histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+    })
+    stats["calls"] += 1
+    stats["total_s"] += seconds
+    stats["max_s"] = max(stats["max_s"], seconds)
+    stats["bytes"] += nbytes
+    stats["histogram"][bucket] += 1
+
+
+@contextmanager
+def timed(component: str, operation: str,
+          key: str | None = None) -> Iterator[Dict[str, int]]:
+  """
+  Time the block as one call of `component.operation` on `key`.
+
+  The yielded dict may be given a `bytes` entry to record the payload size.
+  """
+  sample = {"bytes": 0}
+  start = time.perf_counter()
+  try:
+    yield sample
+  finally:
+    elapsed = time.perf_counter() - start
+    record_operation(component, operation, key, elapsed, sample["bytes"])
+
+
+def instrumented(component: str, key_attr: str) -> Callable:
+  """Decorate a storage method to record its calls under `self.<key_attr>`."""
+  def decorator(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+      with timed(component, func.__name__, getattr(self, key_attr, None)):
+        return func(self, *args, **kwargs)
+    return wrapper
+  return decorator
+
+
+def operation_stats() -> List[Dict[str, Any]]:
+  with _lock:
+    items = [(k, dict(v, histogram=list(v["histogram"]))) for k, v in _stats.items()]
+  results = []
+  for (component, operation, key), stats in sorted(items, key=lambda i: i[0]):
+    results.append({
+        "component": component,
+        "operation": operation,
+        "key": key,
+        **stats,
+        "mean_s": stats["total_s"] / stats["calls"],
+    })
+  return results
+
+
+def dump_operation_stats() -> str:
+  """Machine-readable dump of the stats, with the histogram bucket bounds."""
+  return json.dumps({
+      "latency_buckets_s": list(LATENCY_BUCKETS),
+      "operations": operation_stats(),
+  }, indent=2)
+
+
+def reset_operation_stats() -> None:
+  with _lock:
+    _stats.clear()
@@ -1,53 +1,122 @@
 from .local_storage import LocalStorage
+from .instrumentation import instrumented
 from typing import Any, List, Dict
-import base64
+from .base import BaseFilesStorage
+from config import STORAGE_CHUNK_SIZE
+from . import codecs
 
 
-class LocalFilesStorage:
-  def __init__(self, store_name: str = "uploads"):
+class LocalFilesStorage(BaseFilesStorage):
+  """
+  Uploaded files kept in the browser localStorage.
+
+  The `store_name` key only holds a lightweight index (id, filename, chunk
+  count and the metadata computed at upload, see `BaseFilesStorage.describe`).
+  File contents live compressed (see `codecs`) in fixed-size chunks under
+  `<store_name>:file:<id>:<n>`, so listing files never moves file contents and
+  reading a dataset only touches its own chunks. Index entries written before
+  chunking carry their content inline and are still readable.
+  """
+
+  def __init__(self, store_name: str = "uploads", chunk_size: int | None = None):
     self.store_name = store_name
+    self.chunk_size = STORAGE_CHUNK_SIZE if chunk_size is None else chunk_size
     self.storage = LocalStorage()
     self._init_store()
 
   def _init_store(self) -> None:
     data = self.storage.get_item(self.store_name)
     if not isinstance(data, list):
-      self.storage._storage.setItem(self.store_name, [])
+      self.storage.update_items(self.store_name, [])
+
+  def _chunk_key(self, file_id: int, index: int) -> str:
+    return f"{self.store_name}:file:{file_id}:{index}"
+
+  def _remove_chunks(self, record: Dict[str, Any]) -> None:
+    for index in range(record.get("chunks", 0)):
+      self.storage.remove_value(self._chunk_key(record["id"], index))
 
-  def upload(self, file) -> None:
-    content = base64.b64encode(file.read()).decode("utf-8")
-    self.storage.set_item(self.store_name, {"filename": file.name, "content": content})
+  @instrumented("local_files", "store_name")
+  def upload(self, file, metadata: Dict[str, Any] | None = None) -> None:
+    data = file.read()
+    metadata = self._metadata(data, metadata)
+    content = codecs.encode_bytes(data)
+    chunks = [content[i:i + self.chunk_size]
+              for i in range(0, len(content), self.chunk_size)]
+    with self.storage.batch():
+      file_id = self.storage.set_item(self.store_name, {
+          "filename": file.name,
+          "chunks": len(chunks),
+          **metadata,
+      })
+      for index, chunk in enumerate(chunks):
+        self.storage.set_value(self._chunk_key(file_id, index), chunk)
 
+  @instrumented("local_files", "store_name")
   def select_all(self) -> List[Dict[str, Any]]:
     data = self.storage.get_item(self.store_name)
     data = data if isinstance(data, list) else []
     return data
 
+  @instrumented("local_files", "store_name")
+  def update_metadata(self, name: str, fields: Dict[str, Any]) -> bool:
+    files = self.select_all()
+    updated = []
+    for f in files:
+      if f.get("filename") == name:
+        f.update(fields)
+        updated.append(f["id"])
+    if updated:
+      self.storage.update_items(self.store_name, files, changed=updated)
+    return bool(updated)
+
+  @instrumented("local_files", "store_name")
+  def read(self, name: str) -> bytes | None:
+    record = next((f for f in self.select_all() if f.get("filename") == name), None)
+    if record is None:
+      return None
+    if "content" in record:
+      return codecs.decode_bytes(record["content"])
+    content = "".join(
+        self.storage.get_value(self._chunk_key(record["id"], index)) or ""
+        for index in range(record.get("chunks", 0)))
+    return codecs.decode_bytes(content)
+
+  @instrumented("local_files", "store_name")
   def exists(self, name: str) -> bool:
     files = self.select_all()
     file_exists = any(f.get("filename") == name for f in files)
     return file_exists
 
+  @instrumented("local_files", "store_name")
   def rename(self, old_name: str, new_name: str) -> bool:
     files = self.select_all()
-    renamed = False
+    renamed = []
     for f in files:
       if f.get("filename") == old_name:
         f["filename"] = new_name
-        renamed = True
+        renamed.append(f["id"])
     if renamed:
-      self.storage.update_items(self.store_name, files)
-    return renamed
+      self.storage.update_items(self.store_name, files, changed=renamed)
+    return bool(renamed)
 
+  @instrumented("local_files", "store_name")
   def remove(self, name: str) -> None:
-    records = self.select_all()
-    updated = [r for r in records if r.get("filename") != name]
-    self.storage.update_items(self.store_name, updated)
+    self.remove_many([name])
 
+  @instrumented("local_files", "store_name")
   def remove_many(self, names: List[str]) -> None:
-    records = self.select_all()
-    updated = [r for r in records if r.get("filename") not in names]
-    self.storage.update_items(self.store_name, updated)
+    with self.storage.batch():
+      records = self.select_all()
+      for r in records:
+        if r.get("filename") in names:
+          self._remove_chunks(r)
+      updated = [r for r in records if r.get("filename") not in names]
+      self.storage.update_items(self.store_name, updated, changed=())
 
+  @instrumented("local_files", "store_name")
   def clear(self) -> None:
-    self.storage.remove_item(self.store_name)
+    with self.storage.batch():
+      for r in self.select_all():
+        self._remove_chunks(r)
+      self.storage.remove_item(self.store_name)
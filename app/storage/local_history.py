@@ -1,11 +1,29 @@
 from .local_storage import LocalStorage
-from typing import Dict, List, Tuple
-from .base import BaseHistoryStorage
+from .instrumentation import instrumented
+from typing import Any, Dict, List, Tuple
+from .base import BaseHistoryStorage, PAYLOAD_FIELDS
 from .exceptions import HistoryNotFoundError
+from .history_records import HistoryResultSet
+from .aggregate import group_records
 from config import logger
+from . import codecs
+import json
+
+# Text fields compressed inline by records written before the payload split.
+COMPRESSED_FIELDS = ("training", "validation", "response_predicted", "prompt", "response_raw")
 
 
 class LocalHistoryStorage(BaseHistoryStorage):
+  """
+  Forecast history kept in the browser localStorage.
+
+  The `storage_key` records only hold the summary of each forecast. The
+  `PAYLOAD_FIELDS` of a record are stored compressed (see `codecs`) under
+  `<storage_key>:payload:<id>` and read one record at a time by payload().
+  Records written before the split carry their payload inline and are still
+  readable.
+  """
+
   def __init__(self, storage_key: str = "history"):
     self.storage = LocalStorage()
     self.storage_key = storage_key
@@ -16,76 +34,133 @@ class LocalHistoryStorage(BaseHistoryStorage):
     return data
 
   def _save(self, records: List[Dict]) -> None:
-    self.storage.update_items(self.storage_key, records)
+    self.storage.update_items(self.storage_key, records, changed=())
+
+  def _payload_key(self, record_id: int) -> str:
+    return f"{self.storage_key}:payload:{record_id}"
+
+  def _remove_payloads(self, record_ids: List[int]) -> None:
+    for record_id in record_ids:
+      self.storage.remove_value(self._payload_key(record_id))
+
+  @staticmethod
+  def _matches(record: Dict, dataset: str, prompt_types: List[str]) -> bool:
+    return record.get("dataset") == dataset and record.get("prompt_type") in prompt_types
 
+  @staticmethod
+  def _decode(record: Dict) -> Dict:
+    return {k: codecs.decode_text(v) if k in COMPRESSED_FIELDS else v
+            for k, v in record.items()}
+
+  @instrumented("local_history", "storage_key")
   def insert(self, **kwargs) -> bool:
     try:
-      self.storage.set_item(self.storage_key, kwargs)
+      summary = {k: v for k, v in kwargs.items() if k not in PAYLOAD_FIELDS}
+      payload = {k: v for k, v in kwargs.items() if k in PAYLOAD_FIELDS}
+      with self.storage.batch():
+        record_id = self.storage.set_item(self.storage_key, summary)
+        self.storage.set_value(self._payload_key(record_id),
+                               codecs.encode_text(json.dumps(payload)))
       logger.info("Record inserted successfully.")
       return True
     except Exception as e:
       logger.error(f"Error inserting record: {e}")
       raise
 
-  def select(self, dataset: str, prompt_types: List[str]) -> List[Tuple]:
+  @instrumented("local_history", "storage_key")
+  def summaries(self, dataset: str, prompt_types: List[str]) -> List[Dict[str, Any]]:
     try:
-      records = self._load()
-      filtered = [
-          r for r in records
-          if r.get("dataset") == dataset and r.get("prompt_type") in prompt_types
+      return [
+          {k: v for k, v in r.items() if k not in PAYLOAD_FIELDS}
+          for r in self._load() if self._matches(r, dataset, prompt_types)
       ]
-      if not filtered:
-        return []
-      keys = list(filtered[0].keys())
-      return [tuple(r[k] for k in keys) for r in filtered]
     except Exception as e:
       logger.error(f"Error selecting records: {e}")
       return []
 
+  @instrumented("local_history", "storage_key")
+  def payload(self, record_id: int) -> Dict[str, Any]:
+    try:
+      value = self.storage.get_value(self._payload_key(record_id))
+      if value is not None:
+        return json.loads(codecs.decode_text(value))
+      record = next((r for r in self._load() if r.get("id") == record_id), {})
+      return {k: v for k, v in self._decode(record).items() if k in PAYLOAD_FIELDS}
+    except Exception as e:
+      logger.error(f"Error loading record payload: {e}")
+      return {}
+
+  @instrumented("local_history", "storage_key")
+  def select(self, dataset: str, prompt_types: List[str]) -> HistoryResultSet:
+    return HistoryResultSet.from_summaries(self.summaries(dataset, prompt_types), self.payload)
+
+  @instrumented("local_history", "storage_key")
+  def select_page(self, dataset: str, prompt_types: List[str], cursor: int | None = None,
+                  limit: int = 20, order: str = "desc") -> Tuple[HistoryResultSet, int | None]:
+    try:
+      self._validate_page(limit, order)
+      summaries = sorted(self.summaries(dataset, prompt_types),
+                         key=lambda r: r["id"], reverse=order == "desc")
+      if cursor is not None:
+        summaries = [r for r in summaries
+                     if (r["id"] < cursor if order == "desc" else r["id"] > cursor)]
+      return HistoryResultSet.from_page(summaries[:limit + 1], limit, self.payload)
+    except Exception as e:
+      logger.error(f"Error selecting records: {e}")
+      raise
+
+  @instrumented("local_history", "storage_key")
+  def count(self, dataset: str, prompt_types: List[str]) -> int:
+    return sum(1 for r in self._load() if self._matches(r, dataset, prompt_types))
+
+  @instrumented("local_history", "storage_key")
   def group_by(self, columns: List[str]) -> List[Dict]:
     try:
       if not columns:
         raise ValueError("Columns list cannot be empty.")
-      records = self._load()
-      filtered = [
-          r for r in records
-          if all(r.get(k) is not None for k in ("smape", "mae", "rmse"))
-      ]
-      return sorted(filtered, key=lambda x: tuple(x[c] for c in columns))
+      return group_records(self._load(), columns)
     except Exception as e:
       logger.error(f"Error grouping records: {e}")
       return []
 
+  @instrumented("local_history", "storage_key")
   def remove(self, record_id: int) -> bool:
     try:
       records = self._load()
       updated = [r for r in records if r.get("id") != record_id]
       if len(updated) == len(records):
         raise HistoryNotFoundError(f"Record with id {record_id} not found.")
-      self._save(updated)
+      with self.storage.batch():
+        self._save(updated)
+        self._remove_payloads([record_id])
       logger.info(f"Record {record_id} removed successfully.")
       return True
     except Exception as e:
       logger.error(f"Error removing record: {e}")
       raise
 
+  @instrumented("local_history", "storage_key")
   def remove_many(self, dataset: str, prompt_types: List[str]) -> bool:
     try:
       records = self._load()
-      updated = [
-          r for r in records
-          if not (r.get("dataset") == dataset and r.get("prompt_type") in prompt_types)
-      ]
-      self._save(updated)
+      removed = [r.get("id") for r in records if self._matches(r, dataset, prompt_types)]
+      updated = [r for r in records if not self._matches(r, dataset, prompt_types)]
+      with self.storage.batch():
+        self._save(updated)
+        self._remove_payloads(removed)
       logger.info("Records removed successfully.")
       return True
     except Exception as e:
       logger.error(f"Error removing records: {e}")
       raise
 
+  @instrumented("local_history", "storage_key")
   def remove_all(self) -> bool:
     try:
-      self._save([])
+      removed = [r.get("id") for r in self._load()]
+      with self.storage.batch():
+        self._save([])
+        self._remove_payloads(removed)
       logger.info("All records removed successfully.")
       return True
     except Exception as e:
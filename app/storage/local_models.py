@@ -1,8 +1,13 @@
 from .local_storage import LocalStorage
-from typing import Dict, List, Tuple
+from .instrumentation import instrumented
+from typing import Dict, List, Optional, Tuple
 from .base import BaseModelsStorage
 from .exceptions import ModelAlreadyExistsError, ModelNotFoundError
 from config import logger
+import streamlit as st
+
+# Per-session lookup indexes over the loaded models, keyed by storage key.
+_INDEX_KEY = "_local_models_index"
 
 
 class LocalModelsStorage(BaseModelsStorage):
@@ -15,21 +20,42 @@ class LocalModelsStorage(BaseModelsStorage):
     data = data if isinstance(data, list) else []
     return data
 
-  def _save(self, models: List[Dict]) -> None:
-    self.storage.update_items(self.storage_key, models)
+  def _save(self, models: List[Dict], changed: List[int] | None = None) -> None:
+    self.storage.update_items(self.storage_key, models, changed)
+
+  def _index(self) -> Dict[Tuple[str, str], Dict]:
+    """
+    Models keyed by (name, provider).
+
+    The index is kept in session state and rebuilt only when the records of
+    the storage key changed outside this class (see LocalStorage.version).
+    """
+    indexes = st.session_state.setdefault(_INDEX_KEY, {})
+    entry = indexes.get(self.storage_key)
+    if entry is None or entry["version"] != self.storage.version(self.storage_key):
+      self._store_index({(m["name"], m["provider"]): m for m in self._load()})
+    return indexes[self.storage_key]["index"]
+
+  def _store_index(self, index: Dict[Tuple[str, str], Dict]) -> None:
+    st.session_state.setdefault(_INDEX_KEY, {})[self.storage_key] = {
+        "version": self.storage.version(self.storage_key), "index": index}
+
+  @instrumented("local_models", "storage_key")
+  def get(self, name: str, provider: str) -> Optional[Dict]:
+    return self._index().get((name, provider))
 
+  @instrumented("local_models", "storage_key")
   def insert(self, name: str, provider: str) -> bool:
     try:
-      models = self._load()
-      if any(m["name"] == name and m["provider"] == provider for m in models):
+      index = self._index()
+      if (name, provider) in index:
         raise ModelAlreadyExistsError(
             f"Model '{name}' already exists for provider '{provider}'."
         )
 
-      self.storage.set_item(self.storage_key, {
-          "name": name,
-          "provider": provider
-      })
+      model = {"name": name, "provider": provider}
+      model_id = self.storage.set_item(self.storage_key, model)
+      self._store_index({**index, (name, provider): {"id": model_id, **model}})
 
       logger.info(f"Model '{name}' inserted successfully (Local).")
       return True
@@ -37,6 +63,7 @@ class LocalModelsStorage(BaseModelsStorage):
       logger.error(f"Error inserting model: {e}")
       raise
 
+  @instrumented("local_models", "storage_key")
   def select(self, provider: str) -> List[Tuple[int, str, str]]:
     try:
       models = self._load()
@@ -46,6 +73,7 @@ class LocalModelsStorage(BaseModelsStorage):
       logger.error(f"Error selecting models: {e}")
       return []
 
+  @instrumented("local_models", "storage_key")
   def select_all(self) -> List[Tuple[int, str, str]]:
     try:
       models = self._load()
@@ -54,46 +82,48 @@ class LocalModelsStorage(BaseModelsStorage):
       logger.error(f"Error selecting all models: {e}")
       return []
 
+  @instrumented("local_models", "storage_key")
   def remove_many(self, models_to_remove: List[Tuple[str, str]]) -> Dict[Tuple[str, str], bool]:
     try:
-      models = self._load()
+      index = dict(self._index())
       results = {}
       for name, provider in models_to_remove:
-        found = any(m["name"] == name and m["provider"] == provider for m in models)
-        if not found:
+        if index.pop((name, provider), None) is None:
           logger.warning(f"Model '{name}' ({provider}) not found.")
           results[(name, provider)] = False
           continue
-        models = [m for m in models if not (
-            m["name"] == name and m["provider"] == provider)]
         logger.info(f"Model '{name}' ({provider}) removed successfully.")
         results[(name, provider)] = True
 
-      self._save(models)
+      if any(results.values()):
+        self._save(list(index.values()), changed=[])
+        self._store_index(index)
       return results
     except Exception as e:
       logger.error(f"Error removing models: {e}")
       return {k: False for k in models_to_remove}
 
+  @instrumented("local_models", "storage_key")
   def rename(self, old_name: str, new_name: str, provider: str) -> bool:
     try:
-      models = self._load()
-      if not any(m["name"] == old_name and m["provider"] == provider for m in models):
+      index = self._index()
+      model = index.get((old_name, provider))
+      if model is None:
         raise ModelNotFoundError(
             f"Model '{old_name}' not found for provider '{provider}'."
         )
 
-      if any(m["name"] == new_name and m["provider"] == provider for m in models):
+      if (new_name, provider) in index:
         raise ModelAlreadyExistsError(
             f"Model '{new_name}' already exists for provider '{provider}'."
         )
 
-      for m in models:
-        if m["name"] == old_name and m["provider"] == provider:
-          m["name"] = new_name
-          break
-
-      self._save(models)
+      old_key = (old_name, provider)
+      index = {(new_name, provider) if key == old_key else key:
+               {**m, "name": new_name} if key == old_key else m
+               for key, m in index.items()}
+      self._save(list(index.values()), changed=[model["id"]])
+      self._store_index(index)
       logger.info(f"Model '{old_name}' renamed to '{new_name}'.")
       return True
     except Exception as e:
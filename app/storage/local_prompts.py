@@ -1,8 +1,13 @@
 from .local_storage import LocalStorage
+from .instrumentation import instrumented
 from typing import Dict, List
 from .base import BasePromptsStorage
 from .exceptions import PromptAlreadyExistsError, PromptNotFoundError
 from config import logger
+import streamlit as st
+
+# Per-session lookup indexes over the loaded prompts, keyed by storage key.
+_INDEX_KEY = "_local_prompts_index"
 
 
 class LocalPromptsStorage(BasePromptsStorage):
@@ -13,20 +18,37 @@ class LocalPromptsStorage(BasePromptsStorage):
   def _load(self) -> List[Dict]:
     return self.storage.get_item(self.storage_key) or []
 
-  def _save(self, prompts: List[Dict]) -> None:
-    self.storage.update_items(self.storage_key, prompts)
+  def _save(self, prompts: List[Dict], changed: List[int] | None = None) -> None:
+    self.storage.update_items(self.storage_key, prompts, changed)
+
+  def _index(self) -> Dict[str, Dict]:
+    """
+    Prompts keyed by name.
+
+    The index is kept in session state and rebuilt only when the records of
+    the storage key changed outside this class (see LocalStorage.version).
+    """
+    indexes = st.session_state.setdefault(_INDEX_KEY, {})
+    entry = indexes.get(self.storage_key)
+    if entry is None or entry["version"] != self.storage.version(self.storage_key):
+      self._store_index({p["name"]: p for p in self._load()})
+    return indexes[self.storage_key]["index"]
+
+  def _store_index(self, index: Dict[str, Dict]) -> None:
+    st.session_state.setdefault(_INDEX_KEY, {})[self.storage_key] = {
+        "version": self.storage.version(self.storage_key), "index": index}
 
+  @instrumented("local_prompts", "storage_key")
   def insert(self, name: str, content: str, variables: dict = None) -> bool:
     variables = variables or {}
     try:
-      prompts = self._load()
-      if any(p["name"] == name for p in prompts):
+      index = self._index()
+      if name in index:
         raise PromptAlreadyExistsError(f"Prompt '{name}' already exists.")
 
-      self.storage.set_item(
-          self.storage_key,
-          {"name": name, "content": content, "variables": variables}
-      )
+      prompt = {"name": name, "content": content, "variables": variables}
+      prompt_id = self.storage.set_item(self.storage_key, prompt)
+      self._store_index({**index, name: {"id": prompt_id, **prompt}})
 
       logger.info(f"Prompt '{name}' inserted successfully.")
       return True
@@ -34,10 +56,10 @@ class LocalPromptsStorage(BasePromptsStorage):
       logger.error(f"Error inserting prompt: {e}")
       raise
 
+  @instrumented("local_prompts", "storage_key")
   def select(self, name: str) -> Dict | None:
     try:
-      prompts = self._load()
-      prompt = next((p for p in prompts if p["name"] == name), None)
+      prompt = self._index().get(name)
       if not prompt:
         raise PromptNotFoundError(f"Prompt '{name}' not found.")
       return prompt
@@ -45,6 +67,7 @@ class LocalPromptsStorage(BasePromptsStorage):
       logger.error(f"Error selecting prompt: {e}")
       raise
 
+  @instrumented("local_prompts", "storage_key")
   def select_all(self) -> List[Dict]:
     try:
       return self._load()
@@ -52,66 +75,67 @@ class LocalPromptsStorage(BasePromptsStorage):
       logger.error(f"Error selecting all prompts: {e}")
       return []
 
+  @instrumented("local_prompts", "storage_key")
   def remove(self, name: str) -> bool:
     try:
-      prompts = self._load()
-      if not any(p["name"] == name for p in prompts):
+      index = dict(self._index())
+      if index.pop(name, None) is None:
         raise PromptNotFoundError(f"Prompt '{name}' not found.")
-      updated = [p for p in prompts if p["name"] != name]
-      self._save(updated)
+      self._save(list(index.values()), changed=[])
+      self._store_index(index)
       logger.info(f"Prompt '{name}' removed successfully.")
     except Exception as e:
       logger.error(f"Error removing prompt: {e}")
       raise
 
+  @instrumented("local_prompts", "storage_key")
   def remove_many(self, names: List[str]) -> Dict[str, bool]:
     try:
-      prompts = self._load()
+      index = dict(self._index())
       results = {}
       for name in names:
-        if any(p["name"] == name for p in prompts):
-          prompts = [p for p in prompts if p["name"] != name]
+        if index.pop(name, None) is not None:
           results[name] = True
           logger.info(f"Prompt '{name}' removed successfully.")
         else:
           results[name] = False
           logger.warning(f"Prompt '{name}' not found.")
-      self._save(prompts)
+      if any(results.values()):
+        self._save(list(index.values()), changed=[])
+        self._store_index(index)
       return results
     except Exception as e:
       logger.error(f"Error removing prompts: {e}")
       return {name: False for name in names}
 
+  @instrumented("local_prompts", "storage_key")
   def update(self, name: str, new_content: str, new_variables: dict) -> bool:
     try:
-      prompts = self._load()
-      found = False
-      for p in prompts:
-        if p["name"] == name:
-          p["content"] = new_content
-          p["variables"] = new_variables
-          found = True
-          break
-      if not found:
+      index = dict(self._index())
+      prompt = index.get(name)
+      if prompt is None:
         raise PromptNotFoundError(f"Prompt '{name}' not found.")
-      self._save(prompts)
+      index[name] = {**prompt, "content": new_content, "variables": new_variables}
+      self._save(list(index.values()), changed=[prompt["id"]])
+      self._store_index(index)
       logger.info(f"Prompt '{name}' updated successfully.")
     except Exception as e:
       logger.error(f"Error updating prompt: {e}")
       raise
 
+  @instrumented("local_prompts", "storage_key")
   def rename(self, old_name: str, new_name: str) -> bool:
     try:
-      prompts = self._load()
-      if not any(p["name"] == old_name for p in prompts):
+      index = self._index()
+      if old_name not in index:
         raise PromptNotFoundError(f"Prompt '{old_name}' not found.")
-      if any(p["name"] == new_name for p in prompts):
+      if new_name in index:
         raise PromptAlreadyExistsError(f"Prompt '{new_name}' already exists.")
-      for p in prompts:
-        if p["name"] == old_name:
-          p["name"] = new_name
-          break
-      self._save(prompts)
+      index = {new_name if name == old_name else name:
+               {**p, "name": new_name} if name == old_name else p
+               for name, p in index.items()}
+      self._save(list(index.values()), changed=[index[new_name]["id"]])
+      self._store_index(index)
       logger.info(f"Prompt '{old_name}' renamed to '{new_name}'.")
     except Exception as e:
       logger.error(f"Error renaming prompt: {e}")
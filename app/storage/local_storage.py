@@ -1,41 +1,434 @@
 from streamlit_local_storage import LocalStorage as StreamlitLS
-from typing import Any, List, Dict
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from config import STORAGE_ACK_TIMEOUT, STORAGE_SEGMENT_SIZE
+from .instrumentation import timed, payload_size
+from .exceptions import StorageNotReadyError
+from typing import Any, Collection, Iterator, List, Dict
+from contextlib import contextmanager
+import streamlit as st
+import copy
 import time
 
+# Writes that have been dispatched to the browser but may not have been applied
+# yet, keyed by item key. See LocalStorage._replay_pending().
+_PENDING_KEY = "_local_storage_pending"
+# Per-session read-through cache of decoded items plus hit/miss counters.
+_CACHE_KEY = "_local_storage_cache"
+_REQUEST_ID_KEY = "_local_storage_request_id"
+# Writes buffered by an open LocalStorage.batch() block.
+_BATCH_KEY = "_local_storage_batch"
+_ALL_ITEMS = "*"
+# Key of the component that mirrors the browser localStorage into the session.
+_MIRROR_KEY = "storage_init"
+
 
 class LocalStorage:
-  def __init__(self):
-    self._storage = StreamlitLS()
+  def __init__(self, timeout: float | None = None, segment_size: int | None = None):
+    self.timeout = STORAGE_ACK_TIMEOUT if timeout is None else timeout
+    self.segment_size = STORAGE_SEGMENT_SIZE if segment_size is None else segment_size
+    self._storage = StreamlitLS(key=_MIRROR_KEY)
+    self._sync_mirror()
+    self._replay_pending()
+
+  @staticmethod
+  def _pending() -> Dict[str, Dict[str, Any]]:
+    if _PENDING_KEY not in st.session_state:
+      st.session_state[_PENDING_KEY] = {}
+    return st.session_state[_PENDING_KEY]
+
+  @staticmethod
+  def _cache() -> Dict[str, Any]:
+    if _CACHE_KEY not in st.session_state:
+      st.session_state[_CACHE_KEY] = {
+          "items": {}, "layouts": {}, "versions": {}, "clock": 0, "hits": 0,
+          "misses": 0, "mirror": None}
+    return st.session_state[_CACHE_KEY]
+
+  @property
+  def ready(self) -> bool:
+    """
+    Whether the session mirror holds the browser's reply.
+
+    The mirror component is mounted on the first run of a session and returns
+    an empty default until the browser answers on a later rerun, so nothing
+    read in that run can be trusted.
+    """
+    return not self._rendered_this_run(_MIRROR_KEY)
+
+  def _sync_mirror(self) -> None:
+    """Drop everything cached from a mirror that has since been replaced."""
+    cache = self._cache()
+    mirror = self._storage.storedItems
+    if cache["mirror"] is mirror:
+      return
+    cache["items"].clear()
+    cache["layouts"].clear()
+    self._touch(*cache["versions"])
+    batch = st.session_state.get(_BATCH_KEY)
+    if batch is not None:
+      batch["snapshots"].clear()
+    cache["mirror"] = mirror if self.ready else None
+
+  @classmethod
+  def _touch(cls, *keys: str) -> None:
+    cache = cls._cache()
+    for key in keys:
+      cache["clock"] += 1
+      cache["versions"][key] = cache["clock"]
+
+  @classmethod
+  def version(cls, key: str) -> int:
+    """Number that changes whenever the records of `key` change in this session."""
+    cache = cls._cache()
+    if key not in cache["versions"]:
+      cls._touch(key)
+    return cache["versions"][key]
+
+  @classmethod
+  def cache_stats(cls) -> Dict[str, Any]:
+    cache = cls._cache()
+    total = cache["hits"] + cache["misses"]
+    return {
+        "hits": cache["hits"],
+        "misses": cache["misses"],
+        "hit_rate": cache["hits"] / total if total else 0.0,
+        "keys": sorted(cache["items"]),
+    }
+
+  @staticmethod
+  def _request_id() -> int:
+    request_id = st.session_state.get(_REQUEST_ID_KEY, 0) + 1
+    st.session_state[_REQUEST_ID_KEY] = request_id
+    return request_id
+
+  @staticmethod
+  def _rendered_this_run(component_key: str) -> bool:
+    ctx = get_script_run_ctx()
+    return ctx is not None and component_key in ctx.widget_user_keys_this_run
+
+  def _render(self, request: Dict[str, Any]) -> None:
+    component_key = f"local_storage:{request['method']}:{request['id']}"
+    if self._rendered_this_run(component_key):
+      return
+    with timed("local_storage", request["method"], request["key"]) as sample:
+      match request["method"]:
+        case "setItem":
+          nbytes = request.get("bytes")
+          sample["bytes"] = payload_size(request["value"]) if nbytes is None else nbytes
+          self._storage.setItem(request["key"], request["value"], key=component_key)
+        case "eraseItem":
+          self._storage.eraseItem(request["key"], key=component_key)
+          self._storage.storedItems.pop(request["key"], None)
+        case "deleteAll":
+          self._storage.deleteAll(key=component_key)
+
+  def _dispatch(self, method: str, key: str, value: Any = None,
+                nbytes: int | None = None) -> None:
+    """
+    Send a write to the browser tagged with a unique request id.
+
+    The component only reports back to Python on the next rerun, so instead of
+    blocking for a fixed delay the request is kept in a per-session ledger and
+    re-rendered under the same id until `timeout` seconds have passed. A write
+    interrupted by `st.rerun()` is therefore still delivered, while the caller
+    returns immediately. Newer requests supersede older ones for the same key.
+
+    Raises StorageNotReadyError until the mirror holds the browser's reply, as
+    manifests and segments computed from the empty mirror would overwrite it.
+    """
+    if not self.ready:
+      raise StorageNotReadyError(key)
+    batch = st.session_state.get(_BATCH_KEY)
+    if batch is not None:
+      if method == "deleteAll":
+        batch["writes"].clear()
+      batch["writes"].pop(key, None)
+      batch["writes"][key] = (method, value, nbytes)
+      return
+
+    pending = self._pending()
+    if method == "deleteAll":
+      pending.clear()
+    else:
+      pending.pop(key, None)
+    request = {
+        "id": self._request_id(),
+        "method": method,
+        "key": key,
+        "value": value,
+        "bytes": nbytes,
+        "issued_at": time.monotonic(),
+    }
+    pending[key] = request
+    self._render(request)
+
+  @contextmanager
+  def batch(self) -> Iterator["LocalStorage"]:
+    """
+    Group the writes of several operations, across keys, into one flush.
+
+    Inside the block, reads see the buffered state through the session cache,
+    and each key keeps only its last write. On normal exit each buffered key is
+    sent to the browser once. If the block raises, the cache entries it changed
+    are restored and nothing is written. Nested blocks join the outer one.
+    """
+    if _BATCH_KEY in st.session_state:
+      yield self
+      return
+
+    st.session_state[_BATCH_KEY] = {"writes": {}, "snapshots": {}}
+    try:
+      yield self
+    except BaseException:
+      cache = self._cache()
+      snapshots = st.session_state.pop(_BATCH_KEY)["snapshots"]
+      for key, (items, layout) in snapshots.items():
+        for name, value in (("items", items), ("layouts", layout)):
+          if value is None:
+            cache[name].pop(key, None)
+          else:
+            cache[name][key] = value
+      self._touch(*snapshots)
+      raise
+
+    writes = st.session_state.pop(_BATCH_KEY)["writes"]
+    for key, (method, value, nbytes) in writes.items():
+      self._dispatch(method, key, value, nbytes)
+
+  def _snapshot(self, *keys: str) -> None:
+    """
+    Save the cached state of `keys` before their first change in a batch.
+
+    Cached records are never modified in place, so copying the lists is enough;
+    only the manifest is copied deeply.
+    """
+    batch = st.session_state.get(_BATCH_KEY)
+    if batch is None:
+      return
+    cache = self._cache()
+    for key in keys:
+      if key in batch["snapshots"]:
+        continue
+      items = cache["items"].get(key)
+      layout = cache["layouts"].get(key)
+      if layout is not None:
+        layout = {
+            "manifest": copy.deepcopy(layout["manifest"]),
+            "segments": {name: list(records)
+                         for name, records in layout["segments"].items()},
+        }
+      batch["snapshots"][key] = (None if items is None else list(items), layout)
+
+  def _replay_pending(self) -> None:
+    pending = self._pending()
+    now = time.monotonic()
+    for key, request in list(pending.items()):
+      if now - request["issued_at"] > self.timeout:
+        del pending[key]
+      else:
+        self._render(request)
+
+  def _layout(self, key: str) -> Dict[str, Any]:
+    """
+    Return the segmented layout of `key`, loading it once per mirror.
+
+    A key is stored as a small manifest (`<key>:manifest`) holding the next id,
+    the ordered list of segment keys and their serialized sizes, each segment
+    being a list of at most `segment_size` records. Inserts only rewrite the
+    tail segment and the manifest. A pre-existing plain list under `<key>` is
+    kept as the first segment, so older data stays readable without a
+    migration. Nothing is cached until the mirror is ready.
+    """
+    layouts = self._cache()["layouts"]
+    if key in layouts:
+      return layouts[key]
+    manifest = self._storage.getItem(f"{key}:manifest")
+    if not isinstance(manifest, dict):
+      legacy = self._storage.getItem(key)
+      manifest = {
+          "next_id": None,
+          "next_segment": 1,
+          "segments": [key] if isinstance(legacy, list) and legacy else [],
+      }
+    sizes = manifest.setdefault("sizes", {})
+    segments = {}
+    for name in manifest["segments"]:
+      data = self._storage.getItem(name)
+      segments[name] = data if isinstance(data, list) else []
+      if name not in sizes:
+        # Manifests written before sizes were recorded; stored on next write.
+        sizes[name] = payload_size(segments[name])
+    if manifest["next_id"] is None:
+      manifest["next_id"] = self._next_id(
+          [r for records in segments.values() for r in records])
+    layout = {"manifest": manifest, "segments": segments}
+    if self.ready:
+      layouts[key] = layout
+    return layout
+
+  def _new_segment(self, key: str, layout: Dict[str, Any]) -> str:
+    manifest = layout["manifest"]
+    name = f"{key}:{manifest['next_segment']}"
+    manifest["next_segment"] += 1
+    manifest["segments"].append(name)
+    layout["segments"][name] = []
+    return name
+
+  def _write_segment(self, layout: Dict[str, Any], name: str) -> None:
+    records = layout["segments"][name]
+    layout["manifest"]["sizes"][name] = payload_size(records)
+    self._dispatch("setItem", name, records, layout["manifest"]["sizes"][name])
+
+  def _write_manifest(self, key: str, layout: Dict[str, Any]) -> None:
+    self._dispatch("setItem", f"{key}:manifest", dict(layout["manifest"]))
 
   def _load(self, key: str) -> List[Dict[str, Any]]:
-    data = self._storage.getItem(key)
-    data = data if isinstance(data, list) else []
-    time.sleep(1)
+    cache = self._cache()
+    if key in cache["items"]:
+      cache["hits"] += 1
+      return cache["items"][key]
+    cache["misses"] += 1
+    with timed("local_storage", "load", key) as sample:
+      # Served from the component's session mirror, no browser round-trip.
+      layout = self._layout(key)
+      names = layout["manifest"]["segments"]
+      data = [r for name in names for r in layout["segments"][name]]
+      sample["bytes"] = sum(layout["manifest"]["sizes"].get(name, 0) for name in names)
+    if self.ready:
+      cache["items"][key] = data
     return data
 
   def _next_id(self, records: List[Dict[str, Any]]) -> int:
     return max((r.get("id", 0) for r in records), default=0) + 1
 
-  def set_item(self, key: str, value: Dict[str, Any]) -> None:
+  def set_item(self, key: str, value: Dict[str, Any]) -> int:
+    self._snapshot(key)
     records = self._load(key)
-    next_id = self._next_id(records)
-    value_with_id = {"id": next_id, **value}
+    layout = self._layout(key)
+    manifest = layout["manifest"]
+    value_with_id = {"id": manifest["next_id"], **value}
+    manifest["next_id"] += 1
+
+    tail = manifest["segments"][-1] if manifest["segments"] else None
+    if tail is None or len(layout["segments"][tail]) >= self.segment_size:
+      tail = self._new_segment(key, layout)
+    layout["segments"][tail].append(value_with_id)
     records.append(value_with_id)
-    self._storage.setItem(key, records)
-    time.sleep(1)
+    self._touch(key)
+
+    self._write_segment(layout, tail)
+    self._write_manifest(key, layout)
+    return value_with_id["id"]
+
+  def get_value(self, key: str) -> Any:
+    """Read a single raw value stored outside the segmented record layout."""
+    batch = st.session_state.get(_BATCH_KEY)
+    if batch is not None:
+      if key in batch["writes"]:
+        method, value, _ = batch["writes"][key]
+        return value if method == "setItem" else None
+      if _ALL_ITEMS in batch["writes"]:
+        return None
+    with timed("local_storage", "get_value", key) as sample:
+      value = self._storage.getItem(key)
+      sample["bytes"] = payload_size(value)
+    return value
+
+  def set_value(self, key: str, value: Any) -> None:
+    self._dispatch("setItem", key, value)
+
+  def remove_value(self, key: str) -> None:
+    self._dispatch("eraseItem", key)
 
   def get_item(self, key: str) -> Any:
-    data = self._load(key)
-    return data
+    """
+    Records of `key`, as copies: changes must go through set_item/update_items.
+
+    Records are copied one level deep; nested values are shared with the cache
+    and must not be modified in place.
+    """
+    return [dict(r) for r in self._load(key)]
+
+  @staticmethod
+  def _segment_changed(before: List[Dict[str, Any]], after: List[Dict[str, Any]],
+                       changed: Collection[int] | None) -> bool:
+    if len(before) != len(after):
+      return True
+    for old, new in zip(before, after):
+      if old.get("id") != new.get("id"):
+        return True
+      if (changed is None or new.get("id") in changed) and old != new:
+        return True
+    return False
+
+  def update_items(self, key: str, records: List[Dict[str, Any]],
+                   changed: Collection[int] | None = None) -> None:
+    """
+    Replace the records of `key`, rewriting only the segments that changed.
+
+    Records keep the segment they already live in (matched by id); records
+    without a known id are appended to the tail. Segments left empty are erased.
+    A segment is rewritten when its ids changed or one of its records differs
+    from the cached one; callers that know which records they modified can pass
+    their ids as `changed` to skip comparing the others.
+    """
+    self._snapshot(key)
+    records = [dict(r) for r in records]
+    layout = self._layout(key)
+    manifest = layout["manifest"]
+    location = {
+        r.get("id"): name
+        for name, segment in layout["segments"].items()
+        for r in segment
+    }
+
+    previous = layout["segments"]
+    updated = {name: [] for name in manifest["segments"]}
+    appended = []
+    for r in records:
+      name = location.get(r.get("id"))
+      if name is None:
+        appended.append(r)
+      else:
+        updated[name].append(r)
+    layout["segments"] = updated
+
+    for r in appended:
+      tail = manifest["segments"][-1] if manifest["segments"] else None
+      if tail is None or len(updated[tail]) >= self.segment_size:
+        tail = self._new_segment(key, layout)
+      updated[tail].append(r)
+
+    for name in list(manifest["segments"]):
+      if not updated[name]:
+        manifest["segments"].remove(name)
+        manifest["sizes"].pop(name, None)
+        del updated[name]
+        self._dispatch("eraseItem", name)
+      elif self._segment_changed(previous.get(name, []), updated[name], changed):
+        self._write_segment(layout, name)
 
-  def update_items(self, key: str, records: List[Dict[str, Any]]) -> None:
-    self._storage.setItem(key, records)
-    time.sleep(1)
+    manifest["next_id"] = max(manifest["next_id"], self._next_id(records))
+    self._write_manifest(key, layout)
+    self._cache()["items"][key] = [
+        r for name in manifest["segments"] for r in updated[name]]
+    self._touch(key)
 
   def remove_item(self, key: str) -> None:
-    self._storage.eraseItem(key)
-    time.sleep(1)
+    self._snapshot(key)
+    cache = self._cache()
+    layout = self._layout(key)
+    for name in layout["manifest"]["segments"]:
+      self._dispatch("eraseItem", name)
+    self._dispatch("eraseItem", f"{key}:manifest")
+    cache["items"].pop(key, None)
+    cache["layouts"].pop(key, None)
+    self._touch(key)
 
   def clear(self) -> None:
-    self._storage.deleteAll()
-    time.sleep(1)
+    cache = self._cache()
+    self._snapshot(*set(cache["items"]) | set(cache["layouts"]))
+    cache["items"].clear()
+    cache["layouts"].clear()
+    self._touch(*cache["versions"])
+    self._dispatch("deleteAll", _ALL_ITEMS)
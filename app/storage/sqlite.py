@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+from typing import Iterator
+import sqlite3
+import os
+
+
+@contextmanager
+def connect(db_path: str) -> Iterator[sqlite3.Connection]:
+  """Open a connection in WAL mode, commit on success and always close it."""
+  directory = os.path.dirname(db_path)
+  if directory:
+    os.makedirs(directory, exist_ok=True)
+  conn = sqlite3.connect(db_path, timeout=30)
+  conn.row_factory = sqlite3.Row
+  try:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+      yield conn
+  finally:
+    conn.close()
@@ -0,0 +1,83 @@
+from typing import Any, Dict, List
+from .base import BaseFilesStorage
+from .sqlite import connect
+import json
+
+
+class SQLiteFilesStorage(BaseFilesStorage):
+  def __init__(self, db_path: str, table: str = "uploads"):
+    self.db_path = db_path
+    self.table = table
+    self._init_table()
+
+  def _init_table(self) -> None:
+    with connect(self.db_path) as conn:
+      conn.execute(
+          f'CREATE TABLE IF NOT EXISTS "{self.table}" '
+          f'(id INTEGER PRIMARY KEY AUTOINCREMENT, filename TEXT NOT NULL UNIQUE, '
+          f'content BLOB, metadata TEXT)')
+      info = conn.execute(f'PRAGMA table_info("{self.table}")')
+      columns = [row["name"] for row in info]
+      if "metadata" not in columns:
+        conn.execute(f'ALTER TABLE "{self.table}" ADD COLUMN metadata TEXT')
+
+  def upload(self, file, metadata: Dict[str, Any] | None = None) -> None:
+    data = file.read()
+    metadata = self._metadata(data, metadata)
+    with connect(self.db_path) as conn:
+      conn.execute(
+          f'INSERT OR REPLACE INTO "{self.table}" (filename, content, metadata) '
+          f'VALUES (?, ?, ?)',
+          (file.name, data, json.dumps(metadata)))
+
+  def select_all(self) -> List[Dict[str, Any]]:
+    with connect(self.db_path) as conn:
+      rows = conn.execute(
+          f'SELECT id, filename, length(content) AS size, metadata '
+          f'FROM "{self.table}" ORDER BY id').fetchall()
+    return [{**json.loads(row["metadata"] or "{}"), "id": row["id"],
+             "filename": row["filename"], "size": row["size"]} for row in rows]
+
+  def update_metadata(self, name: str, fields: Dict[str, Any]) -> bool:
+    with connect(self.db_path) as conn:
+      row = conn.execute(
+          f'SELECT metadata FROM "{self.table}" WHERE filename = ?', (name,)).fetchone()
+      if row is None:
+        return False
+      metadata = {**json.loads(row["metadata"] or "{}"), **fields}
+      conn.execute(
+          f'UPDATE "{self.table}" SET metadata = ? WHERE filename = ?',
+          (json.dumps(metadata), name))
+    return True
+
+  def read(self, name: str) -> bytes | None:
+    with connect(self.db_path) as conn:
+      row = conn.execute(
+          f'SELECT content FROM "{self.table}" WHERE filename = ?', (name,)).fetchone()
+    return None if row is None else bytes(row["content"])
+
+  def exists(self, name: str) -> bool:
+    with connect(self.db_path) as conn:
+      row = conn.execute(
+          f'SELECT 1 FROM "{self.table}" WHERE filename = ?', (name,)).fetchone()
+    return row is not None
+
+  def rename(self, old_name: str, new_name: str) -> bool:
+    with connect(self.db_path) as conn:
+      cursor = conn.execute(
+          f'UPDATE "{self.table}" SET filename = ? WHERE filename = ?',
+          (new_name, old_name))
+    return cursor.rowcount > 0
+
+  def remove(self, name: str) -> None:
+    with connect(self.db_path) as conn:
+      conn.execute(f'DELETE FROM "{self.table}" WHERE filename = ?', (name,))
+
+  def remove_many(self, names: List[str]) -> None:
+    with connect(self.db_path) as conn:
+      conn.executemany(
+          f'DELETE FROM "{self.table}" WHERE filename = ?', [(n,) for n in names])
+
+  def clear(self) -> None:
+    with connect(self.db_path) as conn:
+      conn.execute(f'DELETE FROM "{self.table}"')
@@ -0,0 +1,189 @@
+from typing import Any, Dict, List, Tuple
+from .base import BaseHistoryStorage, PAYLOAD_FIELDS
+from .history_records import HISTORY_COLUMNS, SUMMARY_COLUMNS, HistoryResultSet
+from .exceptions import HistoryNotFoundError
+from .sqlite import connect
+from .aggregate import group_records
+from config import logger
+import json
+
+JSON_COLUMNS = {"columns", "metrics", "statistics_val", "statistics_pred"}
+BOOLEAN_COLUMNS = {"cached"}
+
+
+class SQLiteHistoryStorage(BaseHistoryStorage):
+  def __init__(self, db_path: str, table: str = "history"):
+    self.db_path = db_path
+    self.table = table
+    self._init_table()
+
+  def _init_table(self) -> None:
+    columns = ", ".join(f'"{c}" {t}' for c, t in HISTORY_COLUMNS.items())
+    with connect(self.db_path) as conn:
+      conn.execute(
+          f'CREATE TABLE IF NOT EXISTS "{self.table}" '
+          f'(id INTEGER PRIMARY KEY AUTOINCREMENT, {columns})')
+      info = conn.execute(f'PRAGMA table_info("{self.table}")')
+      existing = {row["name"] for row in info}
+      for column, sql_type in HISTORY_COLUMNS.items():
+        if column not in existing:
+          conn.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{column}" {sql_type}')
+      conn.execute(
+          f'CREATE INDEX IF NOT EXISTS "idx_{self.table}_dataset_prompt_type" '
+          f'ON "{self.table}" (dataset, prompt_type)')
+
+  @staticmethod
+  def _encode(column: str, value: Any) -> Any:
+    if column in JSON_COLUMNS and value is not None:
+      return json.dumps(value)
+    return value
+
+  @staticmethod
+  def _decode(row) -> Dict[str, Any]:
+    record = dict(row)
+    for column in JSON_COLUMNS:
+      if record.get(column) is not None:
+        record[column] = json.loads(record[column])
+    for column in BOOLEAN_COLUMNS:
+      if record.get(column) is not None:
+        record[column] = bool(record[column])
+    return record
+
+  @staticmethod
+  def _validate(columns: List[str]) -> None:
+    unknown = [c for c in columns if c != "id" and c not in HISTORY_COLUMNS]
+    if unknown:
+      raise ValueError(f"Unknown history columns: {', '.join(unknown)}.")
+
+  def insert(self, **kwargs) -> bool:
+    try:
+      self._validate(list(kwargs))
+      columns = list(kwargs)
+      placeholders = ", ".join("?" for _ in columns)
+      names = ", ".join(f'"{c}"' for c in columns)
+      with connect(self.db_path) as conn:
+        conn.execute(
+            f'INSERT INTO "{self.table}" ({names}) VALUES ({placeholders})',
+            [self._encode(c, kwargs[c]) for c in columns])
+      logger.info("Record inserted successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error inserting record: {e}")
+      raise
+
+  def summaries(self, dataset: str, prompt_types: List[str]) -> List[Dict[str, Any]]:
+    try:
+      if not prompt_types:
+        return []
+      names = ", ".join(f'"{c}"' for c in SUMMARY_COLUMNS)
+      placeholders = ", ".join("?" for _ in prompt_types)
+      with connect(self.db_path) as conn:
+        rows = conn.execute(
+            f'SELECT {names} FROM "{self.table}" '
+            f'WHERE dataset = ? AND prompt_type IN ({placeholders}) ORDER BY id',
+            [dataset, *prompt_types]).fetchall()
+      return [self._decode(row) for row in rows]
+    except Exception as e:
+      logger.error(f"Error selecting records: {e}")
+      return []
+
+  def payload(self, record_id: int) -> Dict[str, Any]:
+    try:
+      names = ", ".join(f'"{c}"' for c in PAYLOAD_FIELDS)
+      with connect(self.db_path) as conn:
+        row = conn.execute(
+            f'SELECT {names} FROM "{self.table}" WHERE id = ?', (record_id,)).fetchone()
+      return {} if row is None else self._decode(row)
+    except Exception as e:
+      logger.error(f"Error loading record payload: {e}")
+      return {}
+
+  def select(self, dataset: str, prompt_types: List[str]) -> HistoryResultSet:
+    return HistoryResultSet.from_summaries(
+        self.summaries(dataset, prompt_types), self.payload)
+
+  def select_page(
+      self, dataset: str, prompt_types: List[str], cursor: int | None = None,
+      limit: int = 20, order: str = "desc") -> Tuple[HistoryResultSet, int | None]:
+    try:
+      self._validate_page(limit, order)
+      if not prompt_types:
+        return HistoryResultSet([]), None
+      names = ", ".join(f'"{c}"' for c in SUMMARY_COLUMNS)
+      placeholders = ", ".join("?" for _ in prompt_types)
+      where = f'dataset = ? AND prompt_type IN ({placeholders})'
+      params = [dataset, *prompt_types]
+      if cursor is not None:
+        where += " AND id < ?" if order == "desc" else " AND id > ?"
+        params.append(cursor)
+      with connect(self.db_path) as conn:
+        rows = conn.execute(
+            f'SELECT {names} FROM "{self.table}" WHERE {where} '
+            f'ORDER BY id {order.upper()} LIMIT ?', [*params, limit + 1]).fetchall()
+      return HistoryResultSet.from_page(
+          [self._decode(row) for row in rows], limit, self.payload)
+    except Exception as e:
+      logger.error(f"Error selecting records: {e}")
+      raise
+
+  def count(self, dataset: str, prompt_types: List[str]) -> int:
+    if not prompt_types:
+      return 0
+    placeholders = ", ".join("?" for _ in prompt_types)
+    with connect(self.db_path) as conn:
+      row = conn.execute(
+          f'SELECT COUNT(*) FROM "{self.table}" '
+          f'WHERE dataset = ? AND prompt_type IN ({placeholders})',
+          [dataset, *prompt_types]).fetchone()
+    return row[0]
+
+  def group_by(self, columns: List[str]) -> List[Dict]:
+    try:
+      if not columns:
+        raise ValueError("Columns list cannot be empty.")
+      self._validate(columns)
+      names = ", ".join(f'"{c}"' for c in dict.fromkeys([*columns, "metrics"]))
+      with connect(self.db_path) as conn:
+        rows = conn.execute(
+            f'SELECT {names} FROM "{self.table}" WHERE metrics IS NOT NULL').fetchall()
+      return group_records([self._decode(row) for row in rows], columns)
+    except Exception as e:
+      logger.error(f"Error grouping records: {e}")
+      return []
+
+  def remove(self, record_id: int) -> bool:
+    try:
+      with connect(self.db_path) as conn:
+        cursor = conn.execute(f'DELETE FROM "{self.table}" WHERE id = ?', (record_id,))
+      if cursor.rowcount == 0:
+        raise HistoryNotFoundError(f"Record with id {record_id} not found.")
+      logger.info(f"Record {record_id} removed successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error removing record: {e}")
+      raise
+
+  def remove_many(self, dataset: str, prompt_types: List[str]) -> bool:
+    try:
+      if prompt_types:
+        placeholders = ", ".join("?" for _ in prompt_types)
+        with connect(self.db_path) as conn:
+          conn.execute(
+              f'DELETE FROM "{self.table}" '
+              f'WHERE dataset = ? AND prompt_type IN ({placeholders})',
+              [dataset, *prompt_types])
+      logger.info("Records removed successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error removing records: {e}")
+      raise
+
+  def remove_all(self) -> bool:
+    try:
+      with connect(self.db_path) as conn:
+        conn.execute(f'DELETE FROM "{self.table}"')
+      logger.info("All records removed successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error clearing history: {e}")
+      raise
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional, Tuple
+from .base import BaseModelsStorage
+from .exceptions import ModelAlreadyExistsError, ModelNotFoundError
+from .sqlite import connect
+from config import logger
+import sqlite3
+
+
+class SQLiteModelsStorage(BaseModelsStorage):
+  def __init__(self, db_path: str, table: str = "models"):
+    self.db_path = db_path
+    self.table = table
+    self._init_table()
+
+  def _init_table(self) -> None:
+    with connect(self.db_path) as conn:
+      conn.execute(
+          f'CREATE TABLE IF NOT EXISTS "{self.table}" '
+          f'(id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, '
+          f'provider TEXT NOT NULL)')
+      conn.execute(
+          f'CREATE UNIQUE INDEX IF NOT EXISTS "idx_{self.table}_name_provider" '
+          f'ON "{self.table}" (name, provider)')
+
+  def insert(self, name: str, provider: str) -> bool:
+    try:
+      try:
+        with connect(self.db_path) as conn:
+          conn.execute(
+              f'INSERT INTO "{self.table}" (name, provider) VALUES (?, ?)',
+              (name, provider))
+      except sqlite3.IntegrityError:
+        raise ModelAlreadyExistsError(
+            f"Model '{name}' already exists for provider '{provider}'."
+        )
+
+      logger.info(f"Model '{name}' inserted successfully (SQLite).")
+      return True
+    except Exception as e:
+      logger.error(f"Error inserting model: {e}")
+      raise
+
+  def get(self, name: str, provider: str) -> Optional[Dict]:
+    try:
+      with connect(self.db_path) as conn:
+        row = conn.execute(
+            f'SELECT id, name, provider FROM "{self.table}" '
+            f'WHERE name = ? AND provider = ?',
+            (name, provider)).fetchone()
+      return None if row is None else dict(row)
+    except Exception as e:
+      logger.error(f"Error selecting model: {e}")
+      return None
+
+  def select(self, provider: str) -> List[Tuple[int, str, str]]:
+    try:
+      with connect(self.db_path) as conn:
+        rows = conn.execute(
+            f'SELECT id, name, provider FROM "{self.table}" '
+            f'WHERE provider = ? ORDER BY id',
+            (provider,)).fetchall()
+      return [tuple(row) for row in rows]
+    except Exception as e:
+      logger.error(f"Error selecting models: {e}")
+      return []
+
+  def select_all(self) -> List[Tuple[int, str, str]]:
+    try:
+      with connect(self.db_path) as conn:
+        rows = conn.execute(
+            f'SELECT id, name, provider FROM "{self.table}" ORDER BY id').fetchall()
+      return [tuple(row) for row in rows]
+    except Exception as e:
+      logger.error(f"Error selecting all models: {e}")
+      return []
+
+  def remove_many(
+      self, models_to_remove: List[Tuple[str, str]]) -> Dict[Tuple[str, str], bool]:
+    try:
+      results = {}
+      with connect(self.db_path) as conn:
+        for name, provider in models_to_remove:
+          cursor = conn.execute(
+              f'DELETE FROM "{self.table}" WHERE name = ? AND provider = ?',
+              (name, provider))
+          results[(name, provider)] = cursor.rowcount > 0
+          if results[(name, provider)]:
+            logger.info(f"Model '{name}' ({provider}) removed successfully.")
+          else:
+            logger.warning(f"Model '{name}' ({provider}) not found.")
+      return results
+    except Exception as e:
+      logger.error(f"Error removing models: {e}")
+      return {k: False for k in models_to_remove}
+
+  def rename(self, old_name: str, new_name: str, provider: str) -> bool:
+    try:
+      try:
+        with connect(self.db_path) as conn:
+          cursor = conn.execute(
+              f'UPDATE "{self.table}" SET name = ? WHERE name = ? AND provider = ?',
+              (new_name, old_name, provider))
+      except sqlite3.IntegrityError:
+        raise ModelAlreadyExistsError(
+            f"Model '{new_name}' already exists for provider '{provider}'."
+        )
+
+      if cursor.rowcount == 0:
+        raise ModelNotFoundError(
+            f"Model '{old_name}' not found for provider '{provider}'."
+        )
+
+      logger.info(f"Model '{old_name}' renamed to '{new_name}'.")
+      return True
+    except Exception as e:
+      logger.error(f"Error renaming model: {e}")
+      raise
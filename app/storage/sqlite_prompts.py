@@ -0,0 +1,124 @@
+from typing import Dict, List
+from .base import BasePromptsStorage
+from .exceptions import PromptAlreadyExistsError, PromptNotFoundError
+from .sqlite import connect
+from config import logger
+import sqlite3
+import json
+
+
+class SQLitePromptsStorage(BasePromptsStorage):
+  def __init__(self, db_path: str, table: str = "prompts"):
+    self.db_path = db_path
+    self.table = table
+    self._init_table()
+
+  def _init_table(self) -> None:
+    with connect(self.db_path) as conn:
+      conn.execute(
+          f'CREATE TABLE IF NOT EXISTS "{self.table}" '
+          f'(id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, '
+          f'content TEXT, variables TEXT)')
+
+  @staticmethod
+  def _decode(row) -> Dict:
+    prompt = dict(row)
+    prompt["variables"] = json.loads(prompt["variables"] or "{}")
+    return prompt
+
+  def insert(self, name: str, content: str, variables: dict = None) -> bool:
+    variables = variables or {}
+    try:
+      try:
+        with connect(self.db_path) as conn:
+          conn.execute(
+              f'INSERT INTO "{self.table}" (name, content, variables) VALUES (?, ?, ?)',
+              (name, content, json.dumps(variables)))
+      except sqlite3.IntegrityError:
+        raise PromptAlreadyExistsError(f"Prompt '{name}' already exists.")
+
+      logger.info(f"Prompt '{name}' inserted successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error inserting prompt: {e}")
+      raise
+
+  def select(self, name: str) -> Dict | None:
+    try:
+      with connect(self.db_path) as conn:
+        row = conn.execute(
+            f'SELECT * FROM "{self.table}" WHERE name = ?', (name,)).fetchone()
+      if row is None:
+        raise PromptNotFoundError(f"Prompt '{name}' not found.")
+      return self._decode(row)
+    except Exception as e:
+      logger.error(f"Error selecting prompt: {e}")
+      raise
+
+  def select_all(self) -> List[Dict]:
+    try:
+      with connect(self.db_path) as conn:
+        rows = conn.execute(f'SELECT * FROM "{self.table}" ORDER BY id').fetchall()
+      return [self._decode(row) for row in rows]
+    except Exception as e:
+      logger.error(f"Error selecting all prompts: {e}")
+      return []
+
+  def remove(self, name: str) -> bool:
+    try:
+      with connect(self.db_path) as conn:
+        cursor = conn.execute(f'DELETE FROM "{self.table}" WHERE name = ?', (name,))
+      if cursor.rowcount == 0:
+        raise PromptNotFoundError(f"Prompt '{name}' not found.")
+      logger.info(f"Prompt '{name}' removed successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error removing prompt: {e}")
+      raise
+
+  def remove_many(self, names: List[str]) -> Dict[str, bool]:
+    try:
+      results = {}
+      with connect(self.db_path) as conn:
+        for name in names:
+          cursor = conn.execute(f'DELETE FROM "{self.table}" WHERE name = ?', (name,))
+          results[name] = cursor.rowcount > 0
+          if results[name]:
+            logger.info(f"Prompt '{name}' removed successfully.")
+          else:
+            logger.warning(f"Prompt '{name}' not found.")
+      return results
+    except Exception as e:
+      logger.error(f"Error removing prompts: {e}")
+      return {name: False for name in names}
+
+  def update(self, name: str, new_content: str, new_variables: dict) -> bool:
+    try:
+      with connect(self.db_path) as conn:
+        cursor = conn.execute(
+            f'UPDATE "{self.table}" SET content = ?, variables = ? WHERE name = ?',
+            (new_content, json.dumps(new_variables), name))
+      if cursor.rowcount == 0:
+        raise PromptNotFoundError(f"Prompt '{name}' not found.")
+      logger.info(f"Prompt '{name}' updated successfully.")
+      return True
+    except Exception as e:
+      logger.error(f"Error updating prompt: {e}")
+      raise
+
+  def rename(self, old_name: str, new_name: str) -> bool:
+    try:
+      try:
+        with connect(self.db_path) as conn:
+          cursor = conn.execute(
+              f'UPDATE "{self.table}" SET name = ? WHERE name = ?',
+              (new_name, old_name))
+      except sqlite3.IntegrityError:
+        raise PromptAlreadyExistsError(f"Prompt '{new_name}' already exists.")
+      if cursor.rowcount == 0:
+        raise PromptNotFoundError(f"Prompt '{old_name}' not found.")
+      logger.info(f"Prompt '{old_name}' renamed to '{new_name}'.")
+      return True
+    except Exception as e:
+      logger.error(f"Error renaming prompt: {e}")
+      raise
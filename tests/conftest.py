@@ -0,0 +1,122 @@
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.testing.v1 import AppTest
+from pathlib import Path
+import streamlit as st
+import pytest
+import json
+import sys
+
+# The app imports its packages from the app directory, as `streamlit run` does.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+
+_REPLIED = "_browser_replied"
+
+
+def _mount(component_key: str) -> None:
+  ctx = get_script_run_ctx()
+  if ctx is not None:
+    ctx.widget_user_keys_this_run.add(component_key)
+
+
+class Browser:
+  """
+  Browser side of `streamlit_local_storage`, standing in for the component.
+
+  As with the real component, the session mirror is empty in the run that
+  mounts it and holds the browser's items from the next run on. Values are
+  stored JSON-encoded, as the browser would.
+  """
+
+  def __init__(self, items=None):
+    self.items = {key: json.dumps(value) for key, value in (items or {}).items()}
+    self.writes = []
+
+  def get(self, key):
+    return json.loads(self.items[key]) if key in self.items else None
+
+  def component(self, key: str = "storage_init") -> "FakeLocalStorage":
+    return FakeLocalStorage(self, key)
+
+
+class FakeLocalStorage:
+  def __init__(self, browser: Browser, key: str):
+    self.browser = browser
+    ctx = get_script_run_ctx()
+    if key not in st.session_state:
+      _mount(key)
+      st.session_state[key] = {}
+    elif key not in ctx.widget_user_keys_this_run and _REPLIED not in st.session_state:
+      st.session_state[_REPLIED] = True
+      st.session_state[key] = {k: json.loads(v) for k, v in browser.items.items()}
+    self.storedItems = st.session_state[key]
+
+  def getItem(self, itemKey):
+    return self.storedItems.get(itemKey)
+
+  def setItem(self, itemKey, itemValue, key="set"):
+    _mount(key)
+    self.browser.items[itemKey] = json.dumps(itemValue)
+    self.browser.writes.append(itemKey)
+    self.storedItems[itemKey] = itemValue
+
+  def eraseItem(self, itemKey, key="eraseItem"):
+    _mount(key)
+    self.browser.items.pop(itemKey, None)
+    self.browser.writes.append(itemKey)
+
+  def deleteAll(self, key="deleteAll"):
+    _mount(key)
+    self.browser.items.clear()
+    self.storedItems.clear()
+
+
+def _script(session):
+  from storage import LocalStorage
+  # Writes are not replayed on later runs, so each run only shows its own.
+  storage = LocalStorage(timeout=0, segment_size=session.segment_size)
+  session.ready = storage.ready
+  try:
+    session.result = session.step(storage) if session.step else None
+  except Exception as error:
+    session.error = error
+
+
+class Session:
+  """One browser session: each `run` is a script run that calls `step(storage)`."""
+
+  def __init__(self, segment_size: int = 2):
+    self.segment_size = segment_size
+    self.app = AppTest.from_function(
+        _script, kwargs={"session": self}, default_timeout=10)
+
+  def run(self, step=None):
+    self.step, self.result, self.error = step, None, None
+    self.app.run()
+    assert not self.app.exception, self.app.exception[0].stack_trace
+    if self.error is not None:
+      raise self.error
+    return self.result
+
+
+@pytest.fixture
+def browser(monkeypatch):
+  from storage import local_storage
+  browser = Browser()
+  monkeypatch.setattr(local_storage, "StreamlitLS", browser.component)
+  return browser
+
+
+@pytest.fixture
+def new_session(browser):
+  """A session that has not run yet, so its mirror is still to be mounted."""
+  return Session()
+
+
+@pytest.fixture
+def session(new_session):
+  """A session whose mirror already holds the browser's reply."""
+  session = new_session
+  session.run()
+  session.run()
+  return session
@@ -0,0 +1,45 @@
+from storage import ArrowHistoryStorage, arrow_history
+import os
+
+
+def _insert(history: ArrowHistoryStorage, dataset: str = "air.csv", **kwargs) -> None:
+  history.insert(model="m", provider="p", dataset=dataset, prompt_type="ZERO_SHOT",
+                 columns=["value"], prompt="p", **kwargs,
+                 metrics=[{"sMAPE": 1.0, "MAE": 2.0, "RMSE": 3.0}])
+
+
+def test_inserts_are_parts_until_compaction(tmp_path, monkeypatch):
+  monkeypatch.setattr(arrow_history, "COMPACT_PARTS", 3)
+  history = ArrowHistoryStorage(str(tmp_path))
+  _insert(history)
+  _insert(history)
+  assert len(os.listdir(tmp_path / "parts")) == 2
+  assert not (tmp_path / "history.parquet").exists()
+
+  _insert(history)
+  assert os.listdir(tmp_path / "parts") == []
+  assert (tmp_path / "history.parquet").exists()
+
+
+def test_reload_merges_main_table_and_parts(tmp_path, monkeypatch):
+  monkeypatch.setattr(arrow_history, "COMPACT_PARTS", 2)
+  history = ArrowHistoryStorage(str(tmp_path))
+  for _ in range(3):
+    _insert(history)
+  arrow_history._tables.clear()
+
+  assert history.count("air.csv", ["ZERO_SHOT"]) == 3
+  page, cursor = history.select_page("air.csv", ["ZERO_SHOT"], limit=2)
+  assert [r.id for r in page.records] == [3, 2]
+  assert cursor == 2
+
+
+def test_remove_many_drops_rows_and_blobs(tmp_path):
+  history = ArrowHistoryStorage(str(tmp_path))
+  _insert(history)
+  _insert(history, dataset="other.csv")
+  history.remove_many("air.csv", ["ZERO_SHOT"])
+
+  assert history.count("air.csv", ["ZERO_SHOT"]) == 0
+  assert history.count("other.csv", ["ZERO_SHOT"]) == 1
+  assert os.listdir(tmp_path / "blobs") == ["2.json.gz"]
@@ -0,0 +1,30 @@
+from storage import codecs
+import base64
+
+
+def test_bytes_round_trip_compressed():
+  data = b"date,value\n" + b"2024-01-01,1.5\n" * 200
+  encoded = codecs.encode_bytes(data)
+
+  assert encoded.startswith("l4t+")
+  assert len(encoded) < len(data)
+  assert codecs.decode_bytes(encoded) == data
+
+
+def test_incompressible_bytes_are_plain_base64():
+  data = bytes(range(16))
+  assert codecs.encode_bytes(data) == base64.b64encode(data).decode("ascii")
+  assert codecs.decode_bytes(codecs.encode_bytes(data)) == data
+
+
+def test_text_is_only_compressed_when_long():
+  assert codecs.encode_text(None) is None
+  assert codecs.encode_text("short") == "short"
+  text = "0.5, " * 200
+  assert codecs.encode_text(text) != text
+  assert codecs.decode_text(codecs.encode_text(text)) == text
+
+
+def test_values_written_before_compression_are_read_unchanged():
+  assert codecs.decode_text("plain text") == "plain text"
+  assert codecs.decode_bytes(base64.b64encode(b"raw").decode("ascii")) == b"raw"
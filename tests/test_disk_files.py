@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+from storage import DiskFilesStorage
+import io
+import os
+
+CSV = b"date,value\n2024-01-01,1\n2024-01-02,2\n"
+
+
+def _file(name: str, data: bytes = CSV) -> io.BytesIO:
+  file = io.BytesIO(data)
+  file.name = name
+  return file
+
+
+def test_upload_and_read(tmp_path):
+  files = DiskFilesStorage(str(tmp_path))
+  files.upload(_file("a.csv"))
+
+  assert files.read("a.csv") == CSV
+  assert files.read_frame("a.csv")["value"].tolist() == [1, 2]
+
+
+def test_removing_a_duplicate_keeps_the_shared_blobs(tmp_path):
+  files = DiskFilesStorage(str(tmp_path))
+  files.upload(_file("a.csv"))
+  files.upload(_file("b.csv"))
+  files.remove_many(["a.csv"])
+
+  assert files.read("b.csv") == CSV
+  files.remove_many(["b.csv"])
+  assert not [name for name in os.listdir(tmp_path) if name.endswith(".arrow")]
+
+
+def test_concurrent_upload_and_remove_keep_the_index_consistent(tmp_path):
+  files = DiskFilesStorage(str(tmp_path))
+  files.upload(_file("a.csv"))
+
+  def upload(index: int) -> None:
+    files.upload(_file(f"{index}.csv"))
+    files.remove_many([f"{index - 1}.csv", "a.csv"])
+
+  with ThreadPoolExecutor(max_workers=8) as pool:
+    list(pool.map(upload, range(1, 33)))
+  for record in files.select_all():
+    assert files.read_table(record["filename"]) is not None
@@ -0,0 +1,116 @@
+import pytest
+
+
+def test_first_run_reads_are_not_cached(browser, new_session):
+  browser.items["models"] = '[{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]'
+  session = new_session
+
+  assert session.run(lambda storage: storage.get_item("models")) == []
+  assert session.ready is False
+  assert session.run(lambda storage: storage.get_item("models")) == [
+      {"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+  assert session.ready is True
+
+
+def test_writes_before_the_browser_replied_are_refused(browser, new_session):
+  from storage import StorageNotReadyError
+  browser.items["models"] = '[{"id": 1, "name": "a"}]'
+
+  with pytest.raises(StorageNotReadyError):
+    new_session.run(lambda storage: storage.set_item("models", {"name": "b"}))
+  assert browser.writes == []
+
+
+def test_insert_after_the_reply_keeps_existing_records(browser, new_session):
+  browser.items["models"] = '[{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]'
+  new_session.run(lambda storage: storage.get_item("models"))
+
+  assert new_session.run(lambda storage: storage.set_item("models", {"name": "c"})) == 3
+  manifest = browser.get("models:manifest")
+  assert manifest["next_id"] == 4
+  ids = [r["id"] for name in manifest["segments"] for r in browser.get(name)]
+  assert ids == [1, 2, 3]
+
+
+def _insert(*names):
+  def step(storage):
+    return [storage.set_item("models", {"name": name}) for name in names]
+  return step
+
+
+def test_inserts_fill_segments_and_rewrite_only_the_tail(browser, session):
+  assert session.run(_insert("a", "b", "c", "d", "e")) == [1, 2, 3, 4, 5]
+  manifest = browser.get("models:manifest")
+  assert manifest["segments"] == ["models:1", "models:2", "models:3"]
+  assert [r["id"] for r in browser.get("models:2")] == [3, 4]
+
+  browser.writes.clear()
+  session.run(_insert("f"))
+  assert browser.writes == ["models:3", "models:manifest"]
+  assert session.run(lambda storage: storage.get_item("models"))[-1] == {
+      "id": 6, "name": "f"}
+
+
+def test_update_items_rewrites_only_changed_segments(browser, session):
+  session.run(_insert("a", "b", "c", "d", "e"))
+  browser.writes.clear()
+
+  def rename(storage):
+    records = storage.get_item("models")
+    records[2]["name"] = "C"
+    storage.update_items("models", records)
+  session.run(rename)
+
+  assert browser.writes == ["models:2", "models:manifest"]
+  assert [r["name"] for r in browser.get("models:2")] == ["C", "d"]
+
+
+def test_update_items_erases_emptied_segments(browser, session):
+  session.run(_insert("a", "b", "c", "d", "e"))
+  session.run(lambda storage: storage.update_items(
+      "models", [r for r in storage.get_item("models") if r["id"] not in (3, 4)]))
+
+  assert "models:2" not in browser.items
+  assert browser.get("models:manifest")["segments"] == ["models:1", "models:3"]
+  assert session.run(_insert("f")) == [6]
+
+
+def test_legacy_list_is_read_as_the_first_segment(browser, new_session):
+  browser.items["models"] = '[{"id": 1, "name": "a"}]'
+  new_session.run()
+  new_session.run(_insert("b", "c"))
+
+  manifest = browser.get("models:manifest")
+  assert manifest["segments"] == ["models", "models:1"]
+  assert [r["id"] for r in browser.get("models")] == [1, 2]
+  assert [r["id"] for r in browser.get("models:1")] == [3]
+
+
+def test_batch_flushes_each_key_once(browser, session):
+  def step(storage):
+    with storage.batch():
+      storage.set_item("models", {"name": "a"})
+      storage.set_item("models", {"name": "b"})
+      storage.set_value("flag", True)
+  session.run(step)
+
+  assert sorted(browser.writes) == ["flag", "models:1", "models:manifest"]
+  assert browser.get("models:1") == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+
+def test_batch_rolls_back_the_cache_on_error(browser, session):
+  session.run(_insert("a"))
+  browser.writes.clear()
+
+  def step(storage):
+    with storage.batch():
+      storage.set_item("models", {"name": "b"})
+      storage.update_items("models", [])
+      raise RuntimeError("rollback")
+  with pytest.raises(RuntimeError):
+    session.run(step)
+
+  assert browser.writes == []
+  assert session.run(lambda storage: storage.get_item("models")) == [
+      {"id": 1, "name": "a"}]
+  assert session.run(_insert("b")) == [2]
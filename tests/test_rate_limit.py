@@ -0,0 +1,41 @@
+import pytest
+
+# The helpers package imports llm4time.
+rate_limit = pytest.importorskip("helpers.rate_limit")
+
+
+def test_bucket_refills_over_a_minute():
+  bucket = rate_limit.TokenBucket(60)
+  bucket.take(60, now=bucket._updated)
+
+  assert bucket.wait_time(1, bucket._updated) == pytest.approx(1.0)
+  assert bucket.wait_time(1, bucket._updated + 1) == pytest.approx(0.0)
+
+
+def test_oversized_calls_wait_for_a_full_bucket():
+  bucket = rate_limit.TokenBucket(100)
+  assert bucket.wait_time(500, bucket._updated) == 0.0
+  bucket.take(500, bucket._updated)
+  assert bucket.wait_time(500, bucket._updated) == pytest.approx(60.0)
+
+
+def test_unlimited_bucket_never_waits():
+  bucket = rate_limit.TokenBucket(0)
+  bucket.take(10**6, bucket._updated)
+  assert bucket.wait_time(10**6, bucket._updated) == 0.0
+
+
+def test_settle_returns_unused_tokens():
+  limiter = rate_limit.RateLimiter(rpm=0, tpm=1000)
+  limiter.acquire(800)
+  limiter.settle(800, 100)
+  assert limiter.acquire(800) < 0.1
+
+
+def test_limiter_throttles_over_the_request_rate():
+  limiter = rate_limit.RateLimiter(rpm=600, tpm=0)
+  limiter.requests.level = 0
+  waited = limiter.acquire(1)
+
+  assert waited == pytest.approx(0.1, abs=0.05)
+  assert limiter.stats()["throttled"] == 1
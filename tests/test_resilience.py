@@ -0,0 +1,116 @@
+import threading
+import pytest
+
+# The helpers package imports llm4time.
+resilience = pytest.importorskip("helpers.resilience")
+
+
+class StatusError(Exception):
+  def __init__(self, status_code: int, headers=None):
+    super().__init__(f"Error code: {status_code}")
+    self.status_code = status_code
+    self.response = type("Response", (), {"headers": headers or {}})()
+
+
+def _calls(*outcomes):
+  """A call that raises or returns each of `outcomes` in turn, counting calls."""
+  outcomes = list(outcomes)
+
+  def call():
+    call.count += 1
+    outcome = outcomes.pop(0)
+    if isinstance(outcome, Exception):
+      raise outcome
+    return outcome
+  call.count = 0
+  return call
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+  monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+
+
+def _retry(call, retries=3, breaker=None, **kwargs):
+  policy = resilience.RetryPolicy(
+      timeout=0, retries=retries, backoff=0.01, backoff_max=1)
+  breaker = breaker or resilience.CircuitBreaker(failure_threshold=10, cooldown=60)
+  stats = {}
+  return resilience.call_with_retries(call, policy, breaker, stats, **kwargs), stats
+
+
+def test_transient_errors_are_retried():
+  call = _calls(StatusError(503), ConnectionError(), "ok")
+  result, stats = _retry(call)
+  assert result == "ok"
+  assert stats["attempts"] == 3
+  assert stats["backoff"] > 0
+
+
+def test_client_errors_are_not_retried():
+  call = _calls(StatusError(400), "ok")
+  with pytest.raises(StatusError):
+    _retry(call)
+  assert call.count == 1
+
+
+def test_retries_are_bounded():
+  call = _calls(*[StatusError(500)] * 5)
+  with pytest.raises(StatusError):
+    _retry(call, retries=2)
+  assert call.count == 3
+
+
+def test_timed_out_calls_are_not_retried():
+  call = _calls(resilience.RequestTimeoutError("slow"), "ok")
+  with pytest.raises(resilience.RequestTimeoutError):
+    _retry(call)
+  assert call.count == 1
+
+
+def test_long_retry_after_fails_fast():
+  call = _calls(StatusError(429, {"retry-after": "120"}), "ok")
+  with pytest.raises(StatusError):
+    _retry(call)
+  assert call.count == 1
+
+
+def test_retryable_can_veto_retries():
+  call = _calls(StatusError(503), "ok")
+  with pytest.raises(StatusError):
+    _retry(call, retryable=lambda: False)
+
+
+def test_breaker_opens_and_lets_one_trial_through(monkeypatch):
+  now = [1000.0]
+  monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+  breaker = resilience.CircuitBreaker(failure_threshold=2, cooldown=30)
+  with pytest.raises(StatusError):
+    _retry(_calls(StatusError(503), StatusError(503), "ok"), breaker=breaker)
+  assert breaker.state == "open"
+  with pytest.raises(resilience.CircuitOpenError):
+    _retry(_calls("ok"), breaker=breaker)
+
+  now[0] += 31
+  assert breaker.state == "half-open"
+  assert breaker.allow()
+  assert not breaker.allow()
+  breaker.success()
+  assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens_the_circuit(monkeypatch):
+  now = [1000.0]
+  monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+  breaker = resilience.CircuitBreaker(failure_threshold=1, cooldown=30)
+  breaker.failure()
+  now[0] += 31
+  assert breaker.allow()
+  breaker.failure()
+  assert breaker.state == "open"
+
+
+def test_call_with_timeout():
+  assert resilience.call_with_timeout(lambda: "ok", 1) == "ok"
+  with pytest.raises(resilience.RequestTimeoutError):
+    resilience.call_with_timeout(lambda: threading.Event().wait(0.5), 0.05)
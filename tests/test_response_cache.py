@@ -0,0 +1,51 @@
+import pytest
+
+# The helpers package imports llm4time.
+response_cache = pytest.importorskip("helpers.response_cache")
+l4t = pytest.importorskip("llm4time")
+
+POOL_KEY = ("openai", "gpt", "https://api", None, "fingerprint")
+
+
+def _response(raw: str, predicted: str | None = "1, 2") -> "l4t.ModelResponse":
+  return l4t.ModelResponse(raw=raw, predicted=predicted, input_tokens=10,
+                           output_tokens=5, time=0.5)
+
+
+def test_key_ignores_credentials_but_not_the_request():
+  key = response_cache.response_key(POOL_KEY, 0.0, "prompt")
+  assert key == response_cache.response_key((*POOL_KEY[:4], "other"), 0.0, "prompt")
+  assert key != response_cache.response_key(POOL_KEY, 0.5, "prompt")
+  assert key != response_cache.response_key(POOL_KEY, 0.0, "other prompt")
+  assert key != response_cache.response_key(POOL_KEY, 0.0, "prompt", max_tokens=10)
+
+
+def test_put_and_get(tmp_path):
+  cache = response_cache.ResponseCache(str(tmp_path / "r.db"), 10**6, 0)
+  cache.put("a", _response("answer"))
+  cache.put("failed", _response("error", predicted=None))
+
+  assert cache.get("a").raw == "answer"
+  assert cache.get("failed") is None
+  assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+  cache = response_cache.ResponseCache(str(tmp_path / "r.db"), 450, 0)
+  for key in ("a", "b", "c"):
+    cache.put(key, _response("x" * 50))
+  cache.get("a")
+  cache.put("d", _response("x" * 50))
+
+  assert cache.get("a") is not None
+  assert cache.get("b") is None
+  assert cache.stats()["bytes"] <= 450
+
+
+def test_expired_entries_are_ignored(tmp_path, monkeypatch):
+  cache = response_cache.ResponseCache(str(tmp_path / "r.db"), 10**6, 60)
+  cache.put("a", _response("answer"))
+  now = response_cache.time.time()
+  monkeypatch.setattr(response_cache.time, "time", lambda: now + 61)
+
+  assert cache.get("a") is None
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+import pytest
+
+# The helpers package imports llm4time.
+streaming = pytest.importorskip("helpers.streaming")
+
+
+def _event(content=None, usage=None):
+  choices = [] if content is None else [
+      SimpleNamespace(delta=SimpleNamespace(content=content))]
+  return SimpleNamespace(choices=choices, usage=usage)
+
+
+class FakeStream(list):
+  closed = False
+
+  def close(self):
+    self.closed = True
+
+
+class FakeSDK:
+  def __init__(self, events):
+    self.events = FakeStream(events)
+    self.requests = []
+    self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+  def create(self, **request):
+    self.requests.append(request)
+    return self.events
+
+
+def _drain(chunks):
+  received = []
+  while True:
+    try:
+      received.append(next(chunks))
+    except StopIteration as stop:
+      return received, stop.value
+
+
+def test_stream_yields_deltas_and_returns_the_response():
+  usage = SimpleNamespace(prompt_tokens=12, completion_tokens=3)
+  sdk = FakeSDK([_event(""), _event("1, "), _event("2"), _event(usage=usage)])
+  client = streaming.StreamingClient(None, lambda: sdk, "gpt")
+
+  chunks, response = _drain(client.stream("prompt", temperature=0.2))
+
+  assert chunks == ["1, ", "2"]
+  assert (response.raw, response.predicted) == ("1, 2", "1, 2")
+  assert (response.input_tokens, response.output_tokens) == (12, 3)
+  assert sdk.requests[0]["stream"] is True
+  assert sdk.requests[0]["stream_options"] == {"include_usage": True}
+  assert sdk.events.closed
+
+
+def test_stream_without_usage():
+  sdk = FakeSDK([_event("1")])
+  client = streaming.StreamingClient(None, lambda: sdk, "local", include_usage=False)
+
+  _, response = _drain(client.stream("prompt"))
+
+  assert "stream_options" not in sdk.requests[0]
+  assert response.input_tokens is None
+
+
+def test_prediction_text_strips_reasoning_and_fences():
+  raw = "<think>the trend is flat</think>\nHere it is:\n```csv\n1, 2\n```\n"
+  assert streaming.prediction_text(raw) == "1, 2"
+  assert streaming.prediction_text(" 1, 2 \n") == "1, 2"